@@ -0,0 +1,66 @@
+import argparse
+import timeit
+import tracemalloc
+
+from benchmarks.corpus import generate_document
+from src.block_markdown import (
+    block_to_block_type,
+    block_to_html_node,
+    markdown_to_html,
+    markdown_to_html_node,
+    scan_blocks,
+)
+from src.html_node import ParentNode
+
+
+def split_blocks(markdown):
+    blocks = filter(None, map(str.strip, markdown.split("\n\n")))
+    return [(block_to_block_type(block), block) for block in blocks]
+
+
+def scanned_blocks(markdown):
+    return list(scan_blocks(markdown))
+
+
+def split_markdown_to_html_node(markdown):
+    return ParentNode("div", [block_to_html_node(block, block_type) for block_type, block in split_blocks(markdown)])
+
+
+def tree_to_html(markdown):
+    return markdown_to_html_node(markdown).to_html()
+
+
+def traced_peak(func, markdown):
+    tracemalloc.start()
+    func(markdown)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the block scanner with split-and-classify parsing.")
+    parser.add_argument("--blocks", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    markdown = generate_document(args.blocks)
+    print(f"document: {args.blocks} blocks, {len(markdown)} chars")
+    cases = (
+        ("blocks/split", split_blocks),
+        ("blocks/scanner", scanned_blocks),
+        ("html/split", split_markdown_to_html_node),
+        ("html/scanner", markdown_to_html_node),
+        ("string/tree", tree_to_html),
+        ("string/direct", markdown_to_html),
+    )
+    for name, func in cases:
+        best = min(timeit.repeat(lambda: func(markdown), number=1, repeat=args.repeat))
+        print(f"{name:>15}: {best * 1000:8.1f} ms ({args.blocks / best:,.0f} blocks/s)")
+    for name, func in (("string/tree", tree_to_html), ("string/direct", markdown_to_html)):
+        peak = traced_peak(func, markdown)
+        print(f"{name:>15}: traced peak {peak / (1024 * 1024):6.1f} MB ({peak / args.blocks:,.0f} bytes/block)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import random
+
+PARAGRAPH_WORDS = ["static", "site", "markdown", "**bold**", "_italic_", "`code`", "node", "block", "tolkien"]
+
+
+def paragraph(rng, words=40):
+    return " ".join(rng.choice(PARAGRAPH_WORDS) for _ in range(words))
+
+
+def generate_document(blocks=10_000, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    for i in range(blocks):
+        kind = i % 6
+        if kind == 0:
+            parts.append(f"{'#' * rng.randint(1, 6)} Heading {i}")
+        elif kind == 1:
+            parts.append(paragraph(rng))
+        elif kind == 2:
+            parts.append("\n".join(f"- {paragraph(rng, 6)}" for _ in range(5)))
+        elif kind == 3:
+            parts.append("\n".join(f"{n}. {paragraph(rng, 6)}" for n in range(1, 6)))
+        elif kind == 4:
+            parts.append("\n".join(f"> {paragraph(rng, 8)}" for _ in range(3)))
+        else:
+            parts.append("```\n" + "\n".join(f"line {n} = {n * i}" for n in range(10)) + "\n```")
+    return "\n\n".join(parts)
+
+
+def link_heavy_document(blocks=500, links=50, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    for i in range(blocks):
+        words = [f"{paragraph(rng, 3)} [link {i}.{n}](https://example.com/{i}/{n})" for n in range(links)]
+        parts.append(" ".join(words))
+    return "\n\n".join(parts)
+
+
+def deep_list_document(blocks=50, items=1_000, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    for i in range(blocks):
+        if i % 2:
+            parts.append("\n".join(f"{n}. {paragraph(rng, 5)}" for n in range(1, items + 1)))
+        else:
+            parts.append("\n".join(f"- {paragraph(rng, 5)}" for _ in range(items)))
+    return "\n\n".join(parts)
+
+
+def long_code_document(blocks=20, lines=5_000):
+    parts = []
+    for i in range(blocks):
+        body = "\n".join(f"    value_{n} = compute(**options, _flag={n % 7})  # `{i}`" for n in range(lines))
+        parts.append(f"```\n{body}\n```")
+    return "\n\n".join(parts)
+
+
+CORPORA = {
+    "large_document": lambda: generate_document(10_000),
+    "link_heavy": link_heavy_document,
+    "deep_lists": deep_list_document,
+    "long_code": long_code_document,
+}
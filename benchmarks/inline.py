@@ -0,0 +1,45 @@
+import argparse
+import random
+import timeit
+
+from src.inline_markdown import (
+    extract_markdown_images,
+    extract_markdown_links,
+    split_nodes_delimiter,
+    split_nodes_media,
+    text_to_textnodes,
+)
+from src.text_node import TextNode, TextType
+
+
+def split_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_media(nodes, extract_markdown_images, TextType.IMAGE)
+    nodes = split_nodes_media(nodes, extract_markdown_links, TextType.LINK)
+    return nodes
+
+
+def link_heavy_paragraph(links, seed=0):
+    rng = random.Random(seed)
+    words = ["text", "**bold**", "_italic_", "`code`"]
+    return " ".join(f"{rng.choice(words)} [link {i}](https://example.com/{i})" for i in range(links))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the inline tokenizer with the chained split passes.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for links in (10, 100, 1000, 5000):
+        text = link_heavy_paragraph(links)
+        assert split_text_to_textnodes(text) == text_to_textnodes(text)
+        for name, func in (("split", split_text_to_textnodes), ("tokenizer", text_to_textnodes)):
+            best = min(timeit.repeat(lambda: func(text), number=1, repeat=args.repeat))
+            print(f"{links:>5} links {name:>9}: {best * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import random
+import resource
+import sys
+import tracemalloc
+
+from benchmarks.corpus import generate_document, paragraph
+from src.block_markdown import markdown_to_html_node
+from src.inline_markdown import text_to_textnodes
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report peak memory while converting a large markdown corpus.")
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--blocks", type=int, default=2_000)
+    parser.add_argument("--trace", action="store_true", help="also report the tracemalloc peak (inflates RSS)")
+    args = parser.parse_args()
+
+    corpus = [generate_document(args.blocks, seed=i) for i in range(args.documents)]
+    rng = random.Random(0)
+    paragraphs = [paragraph(rng) for _ in range(args.documents * args.blocks // 2)]
+    baseline_rss = peak_rss_mb()
+
+    if args.trace:
+        tracemalloc.start()
+    trees = [markdown_to_html_node(markdown) for markdown in corpus]
+    text_nodes = [text_to_textnodes(text) for text in paragraphs]
+
+    print(f"documents: {len(trees)} x {args.blocks} blocks, {len(text_nodes)} tokenized paragraphs")
+    if args.trace:
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"traced peak: {traced_peak / (1024 * 1024):.1f} MB")
+    print(f"peak RSS: {peak_rss_mb():.1f} MB (corpus loaded: {baseline_rss:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
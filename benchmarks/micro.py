@@ -0,0 +1,146 @@
+import argparse
+import re
+import timeit
+
+from src.block_markdown import (
+    BLOCK_HANDLERS,
+    HEADING_PATTERN,
+    BlockType,
+    block_to_html_node,
+    code_to_html_node,
+    heading_to_html_node,
+    olist_to_html_node,
+    paragraph_to_html_node,
+    quote_to_html_node,
+    ulist_to_html_node,
+)
+from src.html_node import LeafNode
+from src.inline_markdown import extract_markdown_images, extract_markdown_links
+from src.text_node import TextNode, TextType, text_node_to_html_node
+
+SAMPLE_BLOCKS = [
+    (BlockType.PARAGRAPH, "plain paragraph with **bold** text"),
+    (BlockType.HEADING, "### Heading"),
+    (BlockType.CODE, "```\ncode\n```"),
+    (BlockType.OLIST, "1. one\n2. two"),
+    (BlockType.ULIST, "- one\n- two"),
+    (BlockType.QUOTE, "> quoted"),
+]
+
+SAMPLE_NODES = [
+    TextNode("text", TextType.TEXT),
+    TextNode("bold", TextType.BOLD),
+    TextNode("italic", TextType.ITALIC),
+    TextNode("code", TextType.CODE),
+    TextNode("link", TextType.LINK, "https://example.com"),
+    TextNode("image", TextType.IMAGE, "/image.png"),
+]
+
+SAMPLE_TEXT = "see [the docs](https://example.com/docs) and ![a cat](/cat.png) or [home](/) for more"
+
+
+def legacy_heading_match(block):
+    return re.match(r"^#{1,6}\s", block)
+
+
+def compiled_heading_match(block):
+    return HEADING_PATTERN.match(block)
+
+
+def legacy_block_handler(block_type):
+    if block_type == BlockType.PARAGRAPH:
+        return paragraph_to_html_node
+    if block_type == BlockType.HEADING:
+        return heading_to_html_node
+    if block_type == BlockType.CODE:
+        return code_to_html_node
+    if block_type == BlockType.OLIST:
+        return olist_to_html_node
+    if block_type == BlockType.ULIST:
+        return ulist_to_html_node
+    if block_type == BlockType.QUOTE:
+        return quote_to_html_node
+    raise ValueError("Invalid block type")
+
+
+def legacy_block_to_html_node(block, block_type):
+    return legacy_block_handler(block_type)(block)
+
+
+def legacy_text_node_to_html_node(text_node):
+    if text_node.text_type == TextType.TEXT:
+        return LeafNode(None, text_node.text)
+    if text_node.text_type == TextType.BOLD:
+        return LeafNode("b", text_node.text)
+    if text_node.text_type == TextType.ITALIC:
+        return LeafNode("i", text_node.text)
+    if text_node.text_type == TextType.CODE:
+        return LeafNode("code", text_node.text)
+    if text_node.text_type == TextType.LINK:
+        return LeafNode("a", text_node.text, {"href": text_node.url})
+    if text_node.text_type == TextType.IMAGE:
+        return LeafNode("img", None, {"src": text_node.url, "alt": text_node.text})
+    raise Exception("Invalid TextType")
+
+
+def legacy_extract_markdown_images(text):
+    alt_text = r"!\[([^]]*)\]"
+    url_links = r"\(([^)]*)\)"
+    return re.findall(alt_text + url_links, text)
+
+
+def legacy_extract_markdown_links(text):
+    alt_text = r"(?<!!)\[([^]]*)\]"
+    url_links = r"\(([^)]*)\)"
+    return re.findall(alt_text + url_links, text)
+
+
+CASES = [
+    (
+        "heading match",
+        legacy_heading_match,
+        compiled_heading_match,
+        [block for _, block in SAMPLE_BLOCKS],
+    ),
+    (
+        "block dispatch",
+        legacy_block_handler,
+        BLOCK_HANDLERS.get,
+        [block_type for block_type, _ in SAMPLE_BLOCKS],
+    ),
+    (
+        "block_to_html_node",
+        lambda pair: legacy_block_to_html_node(pair[1], pair[0]),
+        lambda pair: block_to_html_node(pair[1], pair[0]),
+        SAMPLE_BLOCKS,
+    ),
+    ("text_node_to_html_node", legacy_text_node_to_html_node, text_node_to_html_node, SAMPLE_NODES),
+    ("extract images", legacy_extract_markdown_images, extract_markdown_images, [SAMPLE_TEXT]),
+    ("extract links", legacy_extract_markdown_links, extract_markdown_links, [SAMPLE_TEXT]),
+]
+
+
+def per_call(func, inputs, number, repeat):
+    def run():
+        for value in inputs:
+            func(value)
+
+    best = min(timeit.repeat(run, number=number, repeat=repeat))
+    return best / (number * len(inputs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call timings of the parser's dispatch and regex hot spots.")
+    parser.add_argument("--number", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, legacy, current, inputs in CASES:
+        assert [repr(legacy(value)) for value in inputs] == [repr(current(value)) for value in inputs], name
+        before = per_call(legacy, inputs, args.number, args.repeat)
+        after = per_call(current, inputs, args.number, args.repeat)
+        print(f"{name:>22}: {before * 1e9:8.0f} ns -> {after * 1e9:8.0f} ns per call ({before / after:5.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+from benchmarks.corpus import CORPORA
+from src.block_markdown import (
+    BlockType,
+    block_to_block_type,
+    markdown_to_blocks,
+    markdown_to_html,
+    markdown_to_html_node,
+)
+from src.inline_markdown import text_to_textnodes
+from src.text_node import text_node_to_html_node
+
+
+def inline_texts(block_type, block):
+    lines = block.split("\n")
+    if block_type == BlockType.CODE:
+        return []
+    if block_type == BlockType.HEADING:
+        return [block.lstrip("#")[1:]]
+    if block_type == BlockType.ULIST:
+        return [line[2:] for line in lines]
+    if block_type == BlockType.OLIST:
+        return [line.split(". ", 1)[1] for line in lines]
+    if block_type == BlockType.QUOTE:
+        return [" ".join(line.lstrip(">").strip() for line in lines)]
+    return [" ".join(line.strip() for line in lines)]
+
+
+def time_stage(func, repeat):
+    times = timeit.repeat(func, number=1, repeat=repeat)
+    return {"best_s": min(times), "mean_s": sum(times) / len(times)}
+
+
+def benchmark_corpus(markdown, repeat):
+    blocks = markdown_to_blocks(markdown)
+    block_types = [block_to_block_type(block) for block in blocks]
+    texts = [text for block_type, block in zip(block_types, blocks) for text in inline_texts(block_type, block)]
+    text_nodes = [node for text in texts for node in text_to_textnodes(text)]
+    tree = markdown_to_html_node(markdown)
+
+    stages = {
+        "markdown_to_blocks": (lambda: markdown_to_blocks(markdown), len(blocks)),
+        "block_to_block_type": (lambda: [block_to_block_type(block) for block in blocks], len(blocks)),
+        "text_to_textnodes": (lambda: [text_to_textnodes(text) for text in texts], len(texts)),
+        "text_node_to_html_node": (lambda: [text_node_to_html_node(node) for node in text_nodes], len(text_nodes)),
+        "to_html": (tree.to_html, len(blocks)),
+        "markdown_to_html_node": (lambda: markdown_to_html_node(markdown).to_html(), len(blocks)),
+        "markdown_to_html": (lambda: markdown_to_html(markdown), len(blocks)),
+    }
+    results = {"chars": len(markdown), "blocks": len(blocks)}
+    for name, (func, items) in stages.items():
+        results[name] = time_stage(func, repeat)
+        results[name]["items"] = items
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold, min_time=0.001):
+    regressions = []
+    for corpus, stages in results["corpora"].items():
+        for stage, timing in stages.items():
+            if not isinstance(timing, dict):
+                continue
+            old = baseline.get("corpora", {}).get(corpus, {}).get(stage)
+            if not old or old["best_s"] < min_time:
+                continue
+            ratio = timing["best_s"] / old["best_s"]
+            print(f"{corpus:>15} {stage:>23}: {ratio:6.2f}x baseline")
+            if ratio > 1 + threshold:
+                regressions.append((corpus, stage, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each stage of the markdown to HTML pipeline.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpus", action="append", choices=sorted(CORPORA), help="corpus to run (default: all)")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing --compare")
+    args = parser.parse_args()
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "repeat": args.repeat,
+        "corpora": {},
+    }
+    for name in args.corpus or sorted(CORPORA):
+        results["corpora"][name] = benchmark_corpus(CORPORA[name](), args.repeat)
+        print(f"finished {name}", file=sys.stderr)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for corpus, stage, ratio in regressions:
+            print(f"REGRESSION {corpus} {stage}: {ratio:.2f}x", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
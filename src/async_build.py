@@ -0,0 +1,170 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from src.build import (
+    CHUNKS_PER_JOB,
+    DEFAULT_JOBS,
+    STREAM_THRESHOLD,
+    BuildError,
+    assemble_page,
+    output_path_for,
+    page_title,
+    stale_pages,
+    render_chunk,
+    render_chunk_in_worker,
+    stream_page,
+    stream_page_in_worker,
+    worker_pool,
+    write_page,
+)
+from src.instrument import PROFILER
+from src.references import index_entry, page_digest
+from src.static_files import remove_stale, scan_tree
+
+DEFAULT_IO_CONCURRENCY = 32
+
+
+def content_entries(content_dir_path):
+    return sorted(
+        (rel_path, stat.st_size) for rel_path, stat in scan_tree(content_dir_path) if rel_path.endswith(".md")
+    )
+
+
+def read_text(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+async def build_pages_async(
+    content_dir_path,
+    dest_dir_path,
+    jobs=DEFAULT_JOBS,
+    chunk_size=None,
+    cache=None,
+    stream_threshold=STREAM_THRESHOLD,
+    template=None,
+    previous_index=None,
+    concurrency=DEFAULT_IO_CONCURRENCY,
+    prune=True,
+):
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(concurrency)
+    stats = {"pages": 0, "rendered": 0, "cached": 0, "streamed": 0, "bytes": 0}
+    previous_index = previous_index or {}
+    titles = {}
+    digests = {}
+    index = {}
+    errors = []
+
+    entries = await asyncio.to_thread(content_entries, content_dir_path)
+    stale = stale_pages(previous_index, [rel_path for rel_path, _ in entries], dest_dir_path)
+    stats["removed"] = len(stale)
+    if prune:
+        await asyncio.to_thread(remove_stale, stale, dest_dir_path)
+    else:
+        stats["stale"] = stale
+    small = [rel_path for rel_path, size in entries if size < stream_threshold]
+    large = [rel_path for rel_path, size in entries if size >= stream_threshold]
+    if chunk_size is None:
+        chunk_size = max(1, len(small) // (jobs * CHUNKS_PER_JOB))
+
+    with ExitStack() as executors:
+        io_executor = executors.enter_context(ThreadPoolExecutor(max_workers=concurrency))
+        cache_executor = executors.enter_context(ThreadPoolExecutor(max_workers=1)) if cache is not None else None
+        render_executor = executors.enter_context(worker_pool(jobs)) if jobs > 1 else None
+
+        async def load(rel_path):
+            async with limit:
+                markdown = await loop.run_in_executor(io_executor, read_text, os.path.join(content_dir_path, rel_path))
+            if template is not None:
+                titles[rel_path] = page_title(markdown, rel_path)
+            digests[rel_path] = digest = page_digest(markdown)
+            previous = previous_index.get(rel_path)
+            html = None
+            if cache is not None and previous and previous["digest"] == digest:
+                html = await loop.run_in_executor(cache_executor, cache.get, markdown)
+            return rel_path, markdown, html
+
+        async def write(rel_path, html):
+            dest_path = os.path.join(dest_dir_path, output_path_for(rel_path))
+            page = assemble_page(template, titles.get(rel_path), html)
+            async with limit:
+                written = await loop.run_in_executor(io_executor, write_page, dest_path, page)
+            stats["bytes"] += written
+            stats["pages"] += 1
+
+        async def render(chunk):
+            if render_executor is None:
+                results = await asyncio.to_thread(render_chunk, chunk)
+            else:
+                results, snapshot = await loop.run_in_executor(
+                    render_executor, render_chunk_in_worker, chunk, PROFILER.enabled
+                )
+                if snapshot is not None:
+                    PROFILER.merge(snapshot)
+            sources = dict(chunk)
+            pending = []
+            for rel_path, html, references, error in results:
+                if error is not None:
+                    errors.append((rel_path, error))
+                    continue
+                index[rel_path] = index_entry(digests[rel_path], references)
+                stats["rendered"] += 1
+                pending.append(write(rel_path, html))
+                if cache is not None:
+                    pending.append(loop.run_in_executor(cache_executor, cache.put, sources[rel_path], html))
+            await asyncio.gather(*pending)
+
+        async def stream(rel_path):
+            stream_job = (
+                rel_path,
+                os.path.join(content_dir_path, rel_path),
+                os.path.join(dest_dir_path, output_path_for(rel_path)),
+                template,
+            )
+            async with limit:
+                if render_executor is None:
+                    result = await loop.run_in_executor(io_executor, stream_page, *stream_job)
+                else:
+                    result, snapshot = await loop.run_in_executor(
+                        render_executor, stream_page_in_worker, stream_job, PROFILER.enabled
+                    )
+                    if snapshot is not None:
+                        PROFILER.merge(snapshot)
+            written, references, error = result
+            if error is not None:
+                errors.append((rel_path, error))
+                return
+            index[rel_path] = index_entry(None, references)
+            stats["bytes"] += written
+            stats["pages"] += 1
+            stats["streamed"] += 1
+
+        async with asyncio.TaskGroup() as tasks:
+            for rel_path in large:
+                tasks.create_task(stream(rel_path))
+            chunk = []
+            for loaded in asyncio.as_completed([tasks.create_task(load(rel_path)) for rel_path in small]):
+                rel_path, markdown, html = await loaded
+                if html is not None:
+                    index[rel_path] = previous_index[rel_path]
+                    stats["cached"] += 1
+                    tasks.create_task(write(rel_path, html))
+                    continue
+                chunk.append((rel_path, markdown))
+                if len(chunk) >= chunk_size:
+                    tasks.create_task(render(chunk))
+                    chunk = []
+            if chunk:
+                tasks.create_task(render(chunk))
+    PROFILER.count("bytes_written", stats["bytes"])
+
+    stats["index"] = dict(sorted(index.items()))
+    stats["seconds"] = time.perf_counter() - start
+    if errors:
+        raise BuildError(sorted(errors))
+    return stats
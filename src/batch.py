@@ -0,0 +1,57 @@
+import asyncio
+from collections import deque
+from itertools import islice
+
+from src.block_markdown import markdown_to_html
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_READ_AHEAD = 4
+
+
+def render_many(sources, memo=None):
+    render = memo.render if memo is not None else markdown_to_html
+    for key, markdown in sources:
+        try:
+            html = render(markdown)
+        except Exception as e:
+            e.add_note(f"while rendering {key}")
+            raise
+        yield key, html
+
+
+def read_sources(paths, encoding="utf-8"):
+    sources = []
+    for path in paths:
+        with open(path, encoding=encoding) as f:
+            sources.append((path, f.read()))
+    return sources
+
+
+def render_batch(sources, memo):
+    return list(render_many(sources, memo))
+
+
+def start_read(batch, encoding):
+    return asyncio.ensure_future(asyncio.to_thread(read_sources, batch, encoding))
+
+
+async def render_many_async(
+    paths, memo=None, batch_size=DEFAULT_BATCH_SIZE, read_ahead=DEFAULT_READ_AHEAD, encoding="utf-8", executor=None
+):
+    loop = asyncio.get_running_loop()
+    paths = iter(paths)
+    batches = iter(lambda: list(islice(paths, batch_size)), [])
+    reads = deque(start_read(batch, encoding) for batch in islice(batches, max(1, read_ahead)))
+    try:
+        while reads:
+            sources = await reads.popleft()
+            reads.extend(start_read(batch, encoding) for batch in islice(batches, 1))
+            if executor is None:
+                for result in render_many(sources, memo):
+                    yield result
+                continue
+            for result in await loop.run_in_executor(executor, render_batch, sources, memo):
+                yield result
+    finally:
+        for reading in reads:
+            reading.cancel()
@@ -1,10 +1,14 @@
+import io
 import re
 from enum import Enum
 
 from src.html_node import ParentNode
-from src.inline_markdown import text_to_textnodes
+from src.inline_markdown import text_to_html, text_to_textnodes
+from src.instrument import PROFILER
 from src.text_node import TextNode, TextType, text_node_to_html_node
 
+HEADING_PATTERN = re.compile(r"#{1,6}\s")
+
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -16,15 +20,121 @@ class BlockType(Enum):
 
 
 def markdown_to_blocks(markdown):
-    md_blocks = markdown.split("\n\n")
-    filtered_blocks = list(filter(None, map(str.strip, md_blocks)))
-    return filtered_blocks
+    return [block for _, block in scan_blocks(markdown)]
+
+
+def scan_blocks(markdown):
+    return scan_chunks(split_chunks(markdown))
+
+
+def scan_lines(lines):
+    return scan_chunks(split_line_chunks(lines))
+
+
+def scan_mapped(buffer, encoding="utf-8"):
+    if buffer.find(b"\r") != -1:
+        return scan_lines(mapped_lines(buffer, encoding))
+    return scan_chunks(split_mapped_chunks(buffer, encoding))
+
+
+def split_chunks(markdown):
+    length = len(markdown)
+    pos = 0
+    while pos < length:
+        end = markdown.find("\n\n", pos)
+        if end == -1:
+            end = length
+        yield markdown[pos:end]
+        pos = end + 2
+
+
+def split_mapped_chunks(buffer, encoding="utf-8"):
+    length = len(buffer)
+    pos = 0
+    while pos < length:
+        end = buffer.find(b"\n\n", pos)
+        if end == -1:
+            end = length
+        yield buffer[pos:end].decode(encoding)
+        pos = end + 2
+
+
+def mapped_lines(buffer, encoding="utf-8"):
+    length = len(buffer)
+    pos = 0
+    while pos < length:
+        end = buffer.find(b"\n", pos)
+        end = length if end == -1 else end + 1
+        line = buffer[pos:end].decode(encoding)
+        pos = end
+        if "\r" in line:
+            yield from io.StringIO(line, newline=None)
+        else:
+            yield line
+
+
+def split_line_chunks(lines):
+    chunk_lines = []
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+        if chunk_lines and not line:
+            yield "\n".join(chunk_lines)
+            chunk_lines = []
+        else:
+            chunk_lines.append(line)
+    if chunk_lines:
+        yield "\n".join(chunk_lines)
+
+
+def scan_chunks(chunks):
+    fence_chunks = None
+    for chunk in chunks:
+        if fence_chunks is not None:
+            fence_chunks.append(chunk)
+            if chunk.rstrip().endswith("```"):
+                block = "\n\n".join(fence_chunks).strip()
+                fence_chunks = None
+                yield BlockType.CODE, block
+            continue
+
+        block = chunk.strip()
+        if block.startswith("```") and not is_closed_fence(block):
+            fence_chunks = [chunk]
+        elif block:
+            yield classify_block(block), block
+
+    if fence_chunks is not None:
+        for chunk in fence_chunks:
+            block = chunk.strip()
+            if block:
+                yield classify_block(block), block
+
+
+def is_closed_fence(block):
+    return len(block) >= 6 and block.endswith("```")
+
+
+def classify_block(block):
+    first = block[0]
+    if first == "#" and HEADING_PATTERN.match(block):
+        return BlockType.HEADING
+    if first == "`" and block.startswith("```") and block.endswith("```"):
+        return BlockType.CODE
+    newlines = block.count("\n")
+    if first == ">" and block.count("\n>") == newlines:
+        return BlockType.QUOTE
+    if block.startswith("- ") and block.count("\n- ") == newlines:
+        return BlockType.ULIST
+    if block.startswith("1. ") and is_ordered_list(block.split("\n")):
+        return BlockType.OLIST
+    return BlockType.PARAGRAPH
 
 
 def block_to_block_type(block):
     lines = block.split("\n")
 
-    if re.match(r"^#{1,6}\s", block):
+    if HEADING_PATTERN.match(block):
         return BlockType.HEADING
     if block.startswith("```") and block.endswith("```"):
         return BlockType.CODE
@@ -55,29 +165,73 @@ def all_lines_start_with(lines, prefix):
 
 
 def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
     children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
+    for block_type, block in PROFILER.timed_iter("block_scan", scan_blocks(markdown)):
+        html_node = block_to_html_node(block, block_type)
         children.append(html_node)
     return ParentNode("div", children, None)
 
 
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
-    if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
-    if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
-    if block_type == BlockType.CODE:
-        return code_to_html_node(block)
-    if block_type == BlockType.OLIST:
-        return olist_to_html_node(block)
-    if block_type == BlockType.ULIST:
-        return ulist_to_html_node(block)
-    if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
-    raise ValueError("Invalid block type")
+def markdown_to_html(markdown):
+    out = ["<div>"]
+    for block_type, block in PROFILER.timed_iter("block_scan", scan_blocks(markdown)):
+        BLOCK_WRITERS[block_type](block, out)
+    out.append("</div>")
+    with PROFILER.stage("serialize"):
+        return "".join(out)
+
+
+def stream_markdown_to_html(lines, fp):
+    fp.write("<div>")
+    for block_type, block in PROFILER.timed_iter("block_scan", scan_lines(lines)):
+        fp.write(block_to_html(block, block_type))
+    fp.write("</div>")
+
+
+def stream_mapped_to_html(buffer, fp):
+    fp.write("<div>")
+    for block_type, block in PROFILER.timed_iter("block_scan", scan_mapped(buffer)):
+        fp.write(block_to_html(block, block_type))
+    fp.write("</div>")
+
+
+def block_to_html(block, block_type=None):
+    if block_type is None:
+        block_type = block_to_block_type(block)
+    writer = BLOCK_WRITERS.get(block_type)
+    if writer is None:
+        raise ValueError("Invalid block type")
+    out = []
+    writer(block, out)
+    return "".join(out)
+
+
+class MarkdownDocument:
+    __slots__ = ("markdown", "_node")
+
+    def __init__(self, markdown) -> None:
+        self.markdown = markdown
+        self._node = None
+
+    @property
+    def node(self):
+        if self._node is None:
+            self._node = markdown_to_html_node(self.markdown)
+        return self._node
+
+    def to_html(self):
+        if self._node is None:
+            return markdown_to_html(self.markdown)
+        return self._node.to_html()
+
+
+def block_to_html_node(block, block_type=None):
+    if block_type is None:
+        block_type = block_to_block_type(block)
+    handler = BLOCK_HANDLERS.get(block_type)
+    if handler is None:
+        raise ValueError("Invalid block type")
+    return handler(block)
 
 
 def text_to_children(text):
@@ -152,3 +306,76 @@ def heading_to_html_node(block):
     heading_text = block[heading_count + 1 :]
     children = text_to_children(heading_text)
     return ParentNode(f"h{heading_count}", children)
+
+
+def paragraph_to_html(block, out):
+    out.append("<p>")
+    text_to_html(" ".join([line.strip() for line in block.split("\n")]), out)
+    out.append("</p>")
+
+
+def quote_to_html(block, out):
+    new_lines = []
+    for line in block.split("\n"):
+        if not line.startswith(">"):
+            raise ValueError("Invalid quote block")
+        new_lines.append(line.lstrip(">").strip())
+    out.append("<blockquote>")
+    text_to_html(" ".join(new_lines), out)
+    out.append("</blockquote>")
+
+
+def code_to_html(block, out):
+    if not block.startswith("```") or not block.endswith("```"):
+        raise ValueError("invalid code block")
+    out.append(f"<pre><code>{block[4:-3]}</code></pre>")
+
+
+def olist_to_html(block, out):
+    out.append("<ol>")
+    for item in block.split("\n"):
+        out.append("<li>")
+        text_to_html(item.split(". ", 1)[1], out)
+        out.append("</li>")
+    out.append("</ol>")
+
+
+def ulist_to_html(block, out):
+    out.append("<ul>")
+    for item in block.split("\n"):
+        out.append("<li>")
+        text_to_html(item[2:], out)
+        out.append("</li>")
+    out.append("</ul>")
+
+
+def heading_to_html(block, out):
+    level = len(block) - len(block.lstrip("#"))
+    if level + 1 >= len(block):
+        raise ValueError("Invalid heading level, no content found")
+    out.append(f"<h{level}>")
+    text_to_html(block[level + 1 :], out)
+    out.append(f"</h{level}>")
+
+
+BLOCK_HANDLERS = {
+    BlockType.PARAGRAPH: paragraph_to_html_node,
+    BlockType.HEADING: heading_to_html_node,
+    BlockType.CODE: code_to_html_node,
+    BlockType.OLIST: olist_to_html_node,
+    BlockType.ULIST: ulist_to_html_node,
+    BlockType.QUOTE: quote_to_html_node,
+}
+
+BLOCK_WRITERS = {
+    BlockType.PARAGRAPH: paragraph_to_html,
+    BlockType.HEADING: heading_to_html,
+    BlockType.CODE: code_to_html,
+    BlockType.OLIST: olist_to_html,
+    BlockType.ULIST: ulist_to_html,
+    BlockType.QUOTE: quote_to_html,
+}
+
+PROFILER.register_hook(globals(), "classify_block", "block_classify")
+PROFILER.register_hook(globals(), "text_to_textnodes", "inline_tokenize")
+PROFILER.register_hook(globals(), "text_to_html", "inline_tokenize")
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from src import __version__
+from src.block_markdown import block_to_html, scan_blocks
+from src.text_node import url_rewrite_version
+
+DEFAULT_MAX_ENTRIES = 50_000
+
+
+class BlockMemo:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, version=__version__) -> None:
+        self.max_entries = max_entries
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.fragments = OrderedDict()
+
+    def __repr__(self):
+        return f"BlockMemo({len(self.fragments)}/{self.max_entries} entries, hits={self.hits}, misses={self.misses})"
+
+    @staticmethod
+    def key(block):
+        digest = hashlib.blake2b(url_rewrite_version().encode(), digest_size=16)
+        digest.update(b"\0")
+        digest.update(block.encode())
+        return digest.hexdigest()
+
+    def render_block(self, block, block_type=None):
+        key = self.key(block)
+        html = self.fragments.get(key)
+        if html is not None:
+            self.fragments.move_to_end(key)
+            self.hits += 1
+            return html
+
+        self.misses += 1
+        html = block_to_html(block, block_type)
+        self.fragments[key] = html
+        while len(self.fragments) > self.max_entries:
+            self.fragments.popitem(last=False)
+        return html
+
+    def render(self, markdown):
+        fragments = [self.render_block(block, block_type) for block_type, block in scan_blocks(markdown)]
+        return f"<div>{''.join(fragments)}</div>"
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.fragments),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def save(self, path):
+        path_dir = os.path.dirname(path)
+        if path_dir:
+            os.makedirs(path_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "fragments": list(self.fragments.items())}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, max_entries=DEFAULT_MAX_ENTRIES, version=__version__):
+        memo = cls(max_entries, version)
+        if not os.path.exists(path):
+            return memo
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != version:
+            return memo
+        for key, html in data["fragments"][-max_entries:]:
+            memo.fragments[key] = html
+        return memo
@@ -0,0 +1,282 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from src.block_markdown import mapped_lines, markdown_to_html, stream_mapped_to_html
+from src.fingerprint import ASSET_MANIFEST, set_asset_manifest
+from src.images import IMAGE_MANIFEST, set_image_manifest
+from src.instrument import PROFILER
+from src.references import collecting, index_entry, page_digest
+from src.static_files import mapped_file, remove_stale, scan_tree
+from src.template import extract_title, extract_title_from_lines
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOBS = os.cpu_count() or 1
+CHUNKS_PER_JOB = 4
+STREAM_THRESHOLD = 16 * 1024 * 1024
+COMPARE_CHUNK = 1 << 20
+
+
+class BuildError(Exception):
+    def __init__(self, errors) -> None:
+        self.errors = errors
+        details = "\n".join(f"  {rel_path}: {message}" for rel_path, message in errors)
+        super().__init__(f"{len(errors)} page(s) failed to render:\n{details}")
+
+
+def find_content_files(content_dir_path):
+    return sorted(rel_path for rel_path, _ in scan_tree(content_dir_path) if rel_path.endswith(".md"))
+
+
+def output_path_for(rel_path):
+    return f"{os.path.splitext(rel_path)[0]}.html"
+
+
+def stale_pages(previous_index, rel_paths, dest_dir_path):
+    return [
+        os.path.join(dest_dir_path, output_path_for(rel_path))
+        for rel_path in sorted(previous_index.keys() - set(rel_paths))
+    ]
+
+
+def page_title(markdown, rel_path):
+    return extract_title(markdown) or os.path.splitext(os.path.basename(rel_path))[0]
+
+
+def assemble_page(template, title, content):
+    if template is None:
+        return content
+    return template.render({"Title": title, "Content": content})
+
+
+def render_page(markdown):
+    return markdown_to_html(markdown)
+
+
+def render_chunk(chunk):
+    results = []
+    for rel_path, markdown in chunk:
+        start = time.perf_counter()
+        try:
+            with collecting() as references:
+                html = render_page(markdown)
+            results.append((rel_path, html, references, None))
+        except Exception as e:
+            results.append((rel_path, None, None, f"{type(e).__name__}: {e}"))
+        PROFILER.record_page(rel_path, time.perf_counter() - start)
+    return results
+
+
+def render_chunk_in_worker(chunk, profile):
+    if not profile:
+        return render_chunk(chunk), None
+    PROFILER.enable()
+    PROFILER.reset()
+    return render_chunk(chunk), PROFILER.snapshot()
+
+
+def stream_page(rel_path, source_path, dest_path, template=None):
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with (
+            collecting() as references,
+            mapped_file(source_path) as source,
+            open(tmp_path, "w", encoding="utf-8") as dest,
+        ):
+            if template is None:
+                stream_mapped_to_html(source, dest)
+            else:
+                title = extract_title_from_lines(mapped_lines(source))
+                title = title or os.path.splitext(os.path.basename(rel_path))[0]
+                template.write(dest, {"Title": title}, {"Content": lambda fp: stream_mapped_to_html(source, fp)})
+        written = os.path.getsize(tmp_path)
+        if same_contents(tmp_path, dest_path):
+            os.remove(tmp_path)
+            written = 0
+        else:
+            os.replace(tmp_path, dest_path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None, None, f"{type(e).__name__}: {e}"
+    finally:
+        PROFILER.record_page(rel_path, time.perf_counter() - start)
+    return written, references, None
+
+
+def stream_page_in_worker(stream_job, profile):
+    if not profile:
+        return stream_page(*stream_job), None
+    PROFILER.enable()
+    PROFILER.reset()
+    return stream_page(*stream_job), PROFILER.snapshot()
+
+
+def initialize_worker(assets, images):
+    set_asset_manifest(assets)
+    set_image_manifest(images)
+
+
+def worker_pool(jobs):
+    return ProcessPoolExecutor(
+        max_workers=jobs, initializer=initialize_worker, initargs=(dict(ASSET_MANIFEST), dict(IMAGE_MANIFEST))
+    )
+
+
+def stream_pages(stream_jobs, jobs=DEFAULT_JOBS):
+    if jobs <= 1 or len(stream_jobs) <= 1:
+        return [stream_page(*stream_job) for stream_job in stream_jobs]
+    streamed = []
+    with worker_pool(jobs) as executor:
+        for result, snapshot in executor.map(stream_page_in_worker, stream_jobs, repeat(PROFILER.enabled)):
+            streamed.append(result)
+            if snapshot is not None:
+                PROFILER.merge(snapshot)
+    return streamed
+
+
+def chunk_sources(sources, jobs, chunk_size=None):
+    if chunk_size is None:
+        chunk_size = max(1, len(sources) // (jobs * CHUNKS_PER_JOB))
+    return [sources[i : i + chunk_size] for i in range(0, len(sources), chunk_size)]
+
+
+def render_sources(sources, jobs=DEFAULT_JOBS, chunk_size=None):
+    chunks = chunk_sources(sources, jobs, chunk_size)
+    if jobs <= 1 or len(chunks) <= 1:
+        chunk_results = map(render_chunk, chunks)
+        return [result for results in chunk_results for result in results]
+    rendered = []
+    with worker_pool(jobs) as executor:
+        for results, snapshot in executor.map(render_chunk_in_worker, chunks, repeat(PROFILER.enabled)):
+            rendered.extend(results)
+            if snapshot is not None:
+                PROFILER.merge(snapshot)
+    return rendered
+
+
+def has_contents(path, data):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def same_contents(path, other_path):
+    try:
+        if os.path.getsize(path) != os.path.getsize(other_path):
+            return False
+        with open(path, "rb") as f, open(other_path, "rb") as other:
+            while chunk := f.read(COMPARE_CHUNK):
+                if chunk != other.read(COMPARE_CHUNK):
+                    return False
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def write_page(dest_path, html):
+    data = html.encode("utf-8")
+    if has_contents(dest_path, data):
+        return 0
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = f"{dest_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, dest_path)
+    return len(data)
+
+
+def build_pages(
+    content_dir_path,
+    dest_dir_path,
+    jobs=DEFAULT_JOBS,
+    chunk_size=None,
+    cache=None,
+    stream_threshold=STREAM_THRESHOLD,
+    template=None,
+    previous_index=None,
+):
+    start = time.perf_counter()
+    stats = {"pages": 0, "rendered": 0, "cached": 0, "streamed": 0, "bytes": 0}
+    previous_index = previous_index or {}
+    content_files = find_content_files(content_dir_path)
+    stale = stale_pages(previous_index, content_files, dest_dir_path)
+    remove_stale(stale, dest_dir_path)
+    stats["removed"] = len(stale)
+    pages = {}
+    titles = {}
+    digests = {}
+    index = {}
+    pending = []
+    large = []
+
+    for rel_path in content_files:
+        source_path = os.path.join(content_dir_path, rel_path)
+        if os.path.getsize(source_path) >= stream_threshold:
+            large.append(rel_path)
+            continue
+        with open(source_path, encoding="utf-8") as f:
+            markdown = f.read()
+        if template is not None:
+            titles[rel_path] = page_title(markdown, rel_path)
+        digests[rel_path] = digest = page_digest(markdown)
+        previous = previous_index.get(rel_path)
+        html = cache.get(markdown) if cache is not None and previous and previous["digest"] == digest else None
+        if html is None:
+            pending.append((rel_path, markdown))
+        else:
+            pages[rel_path] = html
+            index[rel_path] = previous
+            stats["cached"] += 1
+
+    errors = []
+    sources = dict(pending)
+    for rel_path, html, references, error in render_sources(pending, jobs, chunk_size):
+        if error is not None:
+            errors.append((rel_path, error))
+            continue
+        pages[rel_path] = html
+        index[rel_path] = index_entry(digests[rel_path], references)
+        stats["rendered"] += 1
+        if cache is not None:
+            cache.put(sources[rel_path], html)
+
+    for rel_path in sorted(pages):
+        dest_path = os.path.join(dest_dir_path, output_path_for(rel_path))
+        html = assemble_page(template, titles.get(rel_path), pages[rel_path])
+        stats["bytes"] += write_page(dest_path, html)
+        stats["pages"] += 1
+
+    stream_jobs = [
+        (
+            rel_path,
+            os.path.join(content_dir_path, rel_path),
+            os.path.join(dest_dir_path, output_path_for(rel_path)),
+            template,
+        )
+        for rel_path in large
+    ]
+    for rel_path, (written, references, error) in zip(large, stream_pages(stream_jobs, jobs)):
+        if error is not None:
+            errors.append((rel_path, error))
+            continue
+        index[rel_path] = index_entry(None, references)
+        stats["bytes"] += written
+        stats["pages"] += 1
+        stats["streamed"] += 1
+    PROFILER.count("bytes_written", stats["bytes"])
+
+    stats["index"] = dict(sorted(index.items()))
+    stats["seconds"] = time.perf_counter() - start
+    if errors:
+        raise BuildError(sorted(errors))
+    return stats
@@ -0,0 +1,166 @@
+import gzip
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.static_files import DEFAULT_WORKERS, is_unchanged, load_manifest, save_manifest, scan_tree
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".mjs", ".json", ".map", ".svg", ".txt", ".xml"}
+DEFAULT_MIN_SAVING = 0.1
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+ZSTD_LEVEL = 19
+
+
+def gzip_compress(data):
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def brotli_compress(data):
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+def zstd_compress(data):
+    if zstd is not None:
+        return zstd.compress(data, level=ZSTD_LEVEL)
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+ENCODERS = [
+    (suffix, compress)
+    for suffix, compress, available in (
+        (".gz", gzip_compress, True),
+        (".br", brotli_compress, brotli is not None),
+        (".zst", zstd_compress, zstd is not None or zstandard is not None),
+    )
+    if available
+]
+VARIANT_SUFFIXES = (".gz", ".br", ".zst")
+
+
+def is_compressible(path):
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def is_up_to_date(variant_path, source_mtime_ns):
+    try:
+        return os.stat(variant_path).st_mtime_ns >= source_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def write_variant(variant_path, data):
+    tmp_path = f"{variant_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, variant_path)
+
+
+def remove_variant(variant_path):
+    if os.path.lexists(variant_path):
+        os.remove(variant_path)
+
+
+def compress_file(source_path, encoders=None, min_saving=DEFAULT_MIN_SAVING, previous=None):
+    encoders = ENCODERS if encoders is None else encoders
+    stat = os.stat(source_path)
+    entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "min_saving": min_saving, "skipped": []}
+    known_skipped = ()
+    if previous is not None and previous["min_saving"] == min_saving and is_unchanged(previous, entry):
+        known_skipped = previous["skipped"]
+    result = {"written": 0, "up_to_date": 0, "skipped": 0, "bytes_in": 0, "bytes_out": 0}
+    pending = []
+    for suffix, compress in encoders:
+        if suffix in known_skipped:
+            entry["skipped"].append(suffix)
+            result["skipped"] += 1
+        elif is_up_to_date(source_path + suffix, stat.st_mtime_ns):
+            result["up_to_date"] += 1
+        else:
+            pending.append((suffix, compress))
+    if not pending:
+        return result, entry
+
+    with open(source_path, "rb") as f:
+        data = f.read()
+    limit = len(data) * (1 - min_saving)
+    for suffix, compress in pending:
+        variant_path = source_path + suffix
+        compressed = compress(data)
+        if len(compressed) > limit:
+            logger.debug(f"Skipping {variant_path}: saves less than {min_saving:.0%}")
+            remove_variant(variant_path)
+            entry["skipped"].append(suffix)
+            result["skipped"] += 1
+            continue
+        write_variant(variant_path, compressed)
+        result["written"] += 1
+        result["bytes_in"] += len(data)
+        result["bytes_out"] += len(compressed)
+    return result, entry
+
+
+def find_stale_variants(dest_dir_path):
+    stale = []
+    for rel_path, _ in scan_tree(dest_dir_path):
+        base, suffix = os.path.splitext(rel_path)
+        if suffix in VARIANT_SUFFIXES and is_compressible(base):
+            source_path = os.path.join(dest_dir_path, base)
+            if not os.path.exists(source_path):
+                stale.append(os.path.join(dest_dir_path, rel_path))
+    return stale
+
+
+def compress_tree(
+    dest_dir_path, workers=DEFAULT_WORKERS, min_saving=DEFAULT_MIN_SAVING, encoders=None, manifest_path=None
+):
+    start = time.perf_counter()
+    encoders = ENCODERS if encoders is None else encoders
+    previous_files = load_manifest(manifest_path) if manifest_path is not None else {}
+    rel_paths = [
+        rel_path for rel_path, stat in scan_tree(dest_dir_path) if is_compressible(rel_path) and stat.st_size > 0
+    ]
+
+    def compress(rel_path):
+        source_path = os.path.join(dest_dir_path, rel_path)
+        return compress_file(source_path, encoders, min_saving, previous_files.get(rel_path))
+
+    if workers <= 1 or len(rel_paths) <= 1:
+        results = list(map(compress, rel_paths))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(compress, rel_paths))
+
+    stats = {"files": len(rel_paths), "written": 0, "up_to_date": 0, "skipped": 0, "bytes_in": 0, "bytes_out": 0}
+    for result, _ in results:
+        for key, value in result.items():
+            stats[key] += value
+    if manifest_path is not None:
+        skipped = {rel_path: entry for rel_path, (_, entry) in zip(rel_paths, results) if entry["skipped"]}
+        save_manifest(manifest_path, skipped)
+
+    stale = find_stale_variants(dest_dir_path)
+    for variant_path in stale:
+        os.remove(variant_path)
+    stats["removed"] = len(stale)
+    stats["encodings"] = [suffix for suffix, _ in encoders]
+    stats["seconds"] = time.perf_counter() - start
+    return stats
@@ -0,0 +1,54 @@
+import hashlib
+import json
+import os
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+HASH_LENGTH = 12
+
+ASSET_MANIFEST = {}
+ASSET_MANIFEST_VERSION = ""
+
+
+def fingerprinted_path(rel_path, digest):
+    base, ext = os.path.splitext(rel_path)
+    return f"{base}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def set_asset_manifest(assets):
+    global ASSET_MANIFEST_VERSION
+    ASSET_MANIFEST.clear()
+    ASSET_MANIFEST.update(assets)
+    ASSET_MANIFEST_VERSION = asset_manifest_digest(assets) if assets else ""
+
+
+def asset_manifest_version():
+    return ASSET_MANIFEST_VERSION
+
+
+def asset_manifest_digest(assets):
+    encoded = json.dumps(assets, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:HASH_LENGTH]
+
+
+def save_asset_manifest(path, assets):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(assets, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def load_asset_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def asset_url(url):
+    if not ASSET_MANIFEST or not url.startswith("/") or url.startswith("//"):
+        return url
+    path = url.split("#", 1)[0].split("?", 1)[0]
+    fingerprinted = ASSET_MANIFEST.get(path[1:])
+    if fingerprinted is None:
+        return url
+    return f"/{fingerprinted}{url[len(path) :]}"
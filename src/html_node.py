@@ -1,4 +1,9 @@
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None) -> None:
         self.tag = tag
         self.value = value
@@ -9,23 +14,41 @@ class HTMLNode:
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def write_html(self, fp):
+        self.render(fp.write)
+
+    def render(self, write):
+        for fragment in self.iter_html():
+            write(fragment)
+
+    def iter_html(self):
+        stack = [self]
+        pop = stack.pop
+        while stack:
+            item = pop()
+            yield item if type(item) is str else item.open_html(stack)
+
+    def open_html(self, stack):
         raise NotImplementedError
 
     def props_to_html(self):
         if self.props is None:
             return ""
-        props_string = ""
-        for attribute, value in self.props.items():
-            props_string += f' {attribute}="{value}"'
-        return "".join(props_string)
+        return "".join([f' {attribute}="{value}"' for attribute, value in self.props.items()])
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None) -> None:
         super().__init__(tag=tag, value=value, children=None, props=props)
 
-    def to_html(self):
+    def open_html(self, stack):
         if self.value is None:
+            if self.tag in VOID_ELEMENTS:
+                return f"<{self.tag}{self.props_to_html()}>"
             raise ValueError("Invalid HTML: No value")
         if self.tag is None:
             return self.value
@@ -36,19 +59,20 @@ class LeafNode(HTMLNode):
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None) -> None:
         super().__init__(tag=tag, value=None, children=children, props=props)
 
-    def to_html(self):
+    def open_html(self, stack):
         if self.tag is None:
             raise ValueError("Invalid HTML: No Tag")
         if self.children is None:
             raise ValueError("Invalid HTML: No text content found")
 
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        stack.append(f"</{self.tag}>")
+        stack.extend(reversed(self.children))
+        return f"<{self.tag}{self.props_to_html()}>"
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import logging
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.static_files import file_digest, is_unchanged, load_manifest, remove_published, save_manifest, scan_tree
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+    features = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+RESIZABLE_FORMATS = {"PNG", "JPEG", "WEBP"}
+DEFAULT_WIDTHS = (480, 960, 1600)
+DEFAULT_QUALITY = 82
+DEFAULT_JOBS = os.cpu_count() or 1
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+IMAGE_MANIFEST = {}
+IMAGE_MANIFEST_VERSION = ""
+
+
+def set_image_manifest(images):
+    global IMAGE_MANIFEST_VERSION
+    IMAGE_MANIFEST.clear()
+    IMAGE_MANIFEST.update(images)
+    IMAGE_MANIFEST_VERSION = ""
+    if images:
+        IMAGE_MANIFEST_VERSION = hashlib.sha256(json.dumps(images, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def image_manifest_version():
+    return IMAGE_MANIFEST_VERSION
+
+
+def webp_available():
+    return features is not None and features.check("webp")
+
+
+def image_settings(widths=DEFAULT_WIDTHS, quality=DEFAULT_QUALITY):
+    return {
+        "widths": sorted(widths),
+        "quality": quality,
+        "resize": Image is not None,
+        "webp": webp_available(),
+    }
+
+
+def settings_digest(digest, settings):
+    key = hashlib.sha256(digest.encode())
+    key.update(json.dumps(settings, sort_keys=True).encode())
+    return key.hexdigest()[:12]
+
+
+def read_png_size(f):
+    header = f.read(24)
+    if header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def read_gif_size(f):
+    return struct.unpack("<HH", f.read(10)[6:10])
+
+
+def read_webp_size(f):
+    header = f.read(30)
+    chunk = header[12:16]
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(header[24:27], "little") + 1, int.from_bytes(header[27:30], "little") + 1
+    return None
+
+
+def read_jpeg_size(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue
+        length = struct.unpack(">H", f.read(2))[0]
+        if marker[1] in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", f.read(5)[1:5])
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def image_size(path):
+    with open(path, "rb") as f:
+        signature = f.read(12)
+        f.seek(0)
+        try:
+            if signature.startswith(b"\x89PNG\r\n\x1a\n"):
+                return read_png_size(f)
+            if signature.startswith(b"GIF8"):
+                return read_gif_size(f)
+            if signature.startswith(b"RIFF") and signature[8:12] == b"WEBP":
+                return read_webp_size(f)
+            if signature.startswith(b"\xff\xd8"):
+                return read_jpeg_size(f)
+        except struct.error:
+            return None
+    return None
+
+
+def variant_path(rel_path, key, width, extension=None):
+    base, ext = os.path.splitext(rel_path)
+    return f"{base}.{key}-{width}w{extension or ext}"
+
+
+def save_variant(image, dest_path, image_format, quality):
+    tmp_path = f"{dest_path}.tmp"
+    options = {"optimize": True}
+    if image_format in ("JPEG", "WEBP"):
+        options["quality"] = quality
+    image.save(tmp_path, image_format, **options)
+    os.replace(tmp_path, dest_path)
+
+
+def process_image(source_path, rel_path, dest_dir_path, digest, settings):
+    key = settings_digest(digest, settings)
+    entry = {"hash": digest, "key": key, "variants": []}
+    if Image is not None:
+        try:
+            return resize_image(source_path, rel_path, dest_dir_path, entry, settings)
+        except OSError as e:
+            logger.warning(f"Could not process {source_path}, publishing it without variants: {e}")
+            for variant in entry["variants"]:
+                remove_published(os.path.join(dest_dir_path, variant["path"]), dest_dir_path)
+            entry = {"hash": digest, "key": key, "variants": []}
+    size = image_size(source_path)
+    if size is not None:
+        entry["width"], entry["height"] = size
+    return entry
+
+
+def resize_image(source_path, rel_path, dest_dir_path, entry, settings):
+    with Image.open(source_path) as image:
+        entry["width"], entry["height"] = image.size
+        entry["format"] = image.format.lower()
+        if image.format not in RESIZABLE_FORMATS or getattr(image, "is_animated", False):
+            return entry
+        image_format = image.format
+        source = image.convert("RGBA") if image.mode == "P" else image
+        widths = [width for width in settings["widths"] if width < image.width] + [image.width]
+        for width in widths:
+            height = round(image.height * width / image.width)
+            resized = source if width == image.width else source.resize((width, height), Image.Resampling.LANCZOS)
+            formats = [(image_format, None)]
+            if settings["webp"] and image_format != "WEBP":
+                formats.append(("WEBP", ".webp"))
+            for output_format, extension in formats:
+                rel_variant = variant_path(rel_path, entry["key"], width, extension)
+                dest_path = os.path.join(dest_dir_path, rel_variant)
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                save_variant(resized, dest_path, output_format, settings["quality"])
+                entry["variants"].append(
+                    {"path": rel_variant.replace(os.sep, "/"), "width": width, "format": output_format.lower()}
+                )
+    return entry
+
+
+def process_image_job(job):
+    return process_image(*job)
+
+
+def optimize_images(
+    source_dir_path,
+    dest_dir_path,
+    manifest_path,
+    widths=DEFAULT_WIDTHS,
+    quality=DEFAULT_QUALITY,
+    jobs=DEFAULT_JOBS,
+):
+    start = time.perf_counter()
+    settings = image_settings(widths, quality)
+    previous_files = load_manifest(manifest_path)
+    current_files = {}
+    pending = []
+    stats = {"images": 0, "processed": 0, "unchanged": 0, "variants": 0, "removed": 0}
+    if Image is None:
+        logger.warning("Pillow is not installed: images get width and height but no resized variants")
+
+    for rel_path, stat in scan_tree(source_dir_path):
+        if os.path.splitext(rel_path)[1].lower() not in IMAGE_EXTENSIONS:
+            continue
+        stats["images"] += 1
+        source_path = os.path.join(source_dir_path, rel_path)
+        previous = previous_files.get(rel_path)
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        if previous is not None and is_unchanged(previous, entry):
+            digest = previous["hash"]
+        else:
+            digest = file_digest(source_path)
+        outputs_exist = previous is not None and all(
+            os.path.exists(os.path.join(dest_dir_path, variant["path"])) for variant in previous["variants"]
+        )
+        if outputs_exist and previous["key"] == settings_digest(digest, settings):
+            current_files[rel_path] = previous | entry
+            stats["unchanged"] += 1
+        else:
+            current_files[rel_path] = entry
+            pending.append((source_path, rel_path, dest_dir_path, digest, settings))
+
+    if jobs <= 1 or len(pending) <= 1:
+        results = list(map(process_image_job, pending))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(process_image_job, pending))
+    for job, result in zip(pending, results):
+        current_files[job[1]].update(result)
+        stats["processed"] += 1
+
+    for rel_path, previous in previous_files.items():
+        current = {variant["path"] for variant in current_files.get(rel_path, {}).get("variants", [])}
+        for variant in previous.get("variants", []):
+            if variant["path"] not in current:
+                remove_published(os.path.join(dest_dir_path, variant["path"]), dest_dir_path)
+                stats["removed"] += 1
+
+    save_manifest(manifest_path, current_files)
+    stats["variants"] = sum(len(entry["variants"]) for entry in current_files.values())
+    stats["manifest"] = {rel_path.replace(os.sep, "/"): image_info(entry) for rel_path, entry in current_files.items()}
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def image_info(entry):
+    info = {}
+    if "width" in entry:
+        info["width"] = entry["width"]
+        info["height"] = entry["height"]
+    srcset = [variant for variant in entry["variants"] if variant["format"] == entry.get("format")]
+    if len(srcset) > 1:
+        info["srcset"] = ", ".join(f"/{variant['path']} {variant['width']}w" for variant in srcset)
+    return info
+
+
+def image_attributes(url):
+    if not IMAGE_MANIFEST or not url.startswith("/") or url.startswith("//"):
+        return None
+    return IMAGE_MANIFEST.get(url.split("#", 1)[0].split("?", 1)[0][1:])
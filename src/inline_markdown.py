@@ -1,16 +1,85 @@
 import re
 
-from src.text_node import TextNode, TextType
+from src import references
+from src.text_node import TextNode, TextType, image_html, link_html
+
+INLINE_MARKERS = re.compile(r"\*\*|_|`|!?\[")
+INLINE_MEDIA = re.compile(r"(!?)\[([^\[\]]*)\]\(([^)]*)\)")
+MARKDOWN_IMAGE = re.compile(r"!\[([^]]*)\]\(([^)]*)\)")
+MARKDOWN_LINK = re.compile(r"(?<!!)\[([^]]*)\]\(([^)]*)\)")
+INLINE_DELIMITERS = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+
+
+def inline_tokens(text):
+    text_start = 0
+    pos = 0
+    while True:
+        marker = INLINE_MARKERS.search(text, pos)
+        if marker is None:
+            break
+        token = marker.group()
+        start = marker.start()
+
+        text_type = INLINE_DELIMITERS.get(token)
+        if text_type is not None:
+            end = marker.end()
+            close = text.find(token, end)
+            if close == -1:
+                raise ValueError("Invalid markdown, formating not closed.")
+            if start > text_start:
+                yield TextType.TEXT, text[text_start:start], None
+            if close > end:
+                yield text_type, text[end:close], None
+            pos = text_start = close + len(token)
+            continue
+
+        media = INLINE_MEDIA.match(text, start)
+        if media is None or token == "[" and image_inside(text, start, media.end()):
+            pos = marker.end()
+            continue
+        if start > text_start:
+            yield TextType.TEXT, text[text_start:start], None
+        bang, alt, url = media.groups()
+        yield TextType.IMAGE if bang else TextType.LINK, alt, url
+        pos = text_start = media.end()
+
+    if text_start < len(text):
+        yield TextType.TEXT, text[text_start:], None
 
 
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_media(nodes, extract_markdown_images, TextType.IMAGE)
-    nodes = split_nodes_media(nodes, extract_markdown_links, TextType.LINK)
-    return nodes
+    return [TextNode(value, text_type, url) for text_type, value, url in inline_tokens(text)]
+
+
+def text_to_html(text, out):
+    append = out.append
+    collected = references.ACTIVE.get()
+    for text_type, value, url in inline_tokens(text):
+        if text_type is TextType.TEXT:
+            append(value)
+        elif text_type is TextType.LINK:
+            append(link_html(value, url))
+            if collected is not None:
+                collected.append(("link", url))
+        elif text_type is TextType.IMAGE:
+            append(image_html(value, url))
+            if collected is not None:
+                collected.append(("image", url))
+        elif text_type is TextType.BOLD:
+            append(f"<b>{value}</b>")
+        elif text_type is TextType.ITALIC:
+            append(f"<i>{value}</i>")
+        else:
+            append(f"<code>{value}</code>")
+
+
+def image_inside(text, start, end):
+    bang = text.find("![", start, end)
+    while bang != -1:
+        if MARKDOWN_IMAGE.match(text, bang):
+            return True
+        bang = text.find("![", bang + 2, end)
+    return False
 
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -37,17 +106,11 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
 
 def extract_markdown_images(text):
-    alt_text = r"!\[([^]]*)\]"
-    url_links = r"\(([^)]*)\)"
-    matches = re.findall(alt_text + url_links, text)
-    return matches
+    return MARKDOWN_IMAGE.findall(text)
 
 
 def extract_markdown_links(text):
-    alt_text = r"(?<!!)\[([^]]*)\]"
-    url_links = r"\(([^)]*)\)"
-    matches = re.findall(alt_text + url_links, text)
-    return matches
+    return MARKDOWN_LINK.findall(text)
 
 
 def split_nodes_media(old_nodes, extract_func, text_type):
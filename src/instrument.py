@@ -0,0 +1,148 @@
+import functools
+import heapq
+import json
+import os
+import time
+from contextlib import nullcontext
+
+NULL_STAGE = nullcontext()
+DEFAULT_SLOWEST = 10
+
+
+class StageTimer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    def __init__(self, enabled=False, slowest=DEFAULT_SLOWEST) -> None:
+        self.enabled = enabled
+        self.slowest = slowest
+        self.hooks = []
+        self.patched = []
+        self.reset()
+
+    def __repr__(self):
+        return f"Profiler(enabled={self.enabled}, stages={sorted(self.stages)})"
+
+    def reset(self):
+        self.stages = {}
+        self.counters = {}
+        self.pages = []
+
+    def register_hook(self, namespace, name, stage):
+        self.hooks.append((namespace, name, stage))
+        if self.enabled:
+            self.patch(namespace, name, stage)
+
+    def patch(self, namespace, name, stage):
+        original = namespace[name]
+        namespace[name] = self.timed(stage, original)
+        self.patched.append((namespace, name, original))
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        for namespace, name, stage in self.hooks:
+            self.patch(namespace, name, stage)
+
+    def disable(self):
+        self.enabled = False
+        while self.patched:
+            namespace, name, original = self.patched.pop()
+            namespace[name] = original
+
+    def timed(self, stage, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(stage, time.perf_counter() - start)
+
+        return wrapper
+
+    def stage(self, name):
+        if not self.enabled:
+            return NULL_STAGE
+        return StageTimer(self, name)
+
+    def timed_iter(self, name, iterable):
+        if not self.enabled:
+            return iterable
+        return self._timed_iter(name, iter(iterable))
+
+    def _timed_iter(self, name, iterator):
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start, calls=0)
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield item
+
+    def add_time(self, name, seconds, calls=1):
+        totals = self.stages.get(name)
+        if totals is None:
+            self.stages[name] = [seconds, calls]
+        else:
+            totals[0] += seconds
+            totals[1] += calls
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_page(self, path, seconds):
+        if not self.enabled:
+            return
+        entry = (seconds, path)
+        if len(self.pages) < self.slowest:
+            heapq.heappush(self.pages, entry)
+        elif entry > self.pages[0]:
+            heapq.heapreplace(self.pages, entry)
+
+    def snapshot(self):
+        return {"stages": self.stages, "counters": self.counters, "pages": self.pages}
+
+    def merge(self, snapshot):
+        for name, (seconds, calls) in snapshot["stages"].items():
+            self.add_time(name, seconds, calls)
+        for name, amount in snapshot["counters"].items():
+            self.count(name, amount)
+        for seconds, path in snapshot["pages"]:
+            self.record_page(path, seconds)
+
+    def report(self):
+        return {
+            "stages": {
+                name: {"seconds": seconds, "calls": calls} for name, (seconds, calls) in sorted(self.stages.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "slowest_pages": [{"path": path, "seconds": seconds} for seconds, path in sorted(self.pages, reverse=True)],
+        }
+
+    def write_report(self, path):
+        report_dir = os.path.dirname(path)
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+PROFILER = Profiler()
@@ -1,6 +1,21 @@
+import argparse
+import asyncio
 import logging
 import os
-import shutil
+import sys
+
+from src.async_build import DEFAULT_IO_CONCURRENCY, build_pages_async
+from src.build import DEFAULT_JOBS, BuildError, build_pages
+from src.compress import DEFAULT_MIN_SAVING, compress_tree
+from src.fingerprint import set_asset_manifest
+from src.images import DEFAULT_QUALITY, DEFAULT_WIDTHS, optimize_images, set_image_manifest
+from src.instrument import DEFAULT_SLOWEST, PROFILER
+from src.publish import StagedPublish, remove_public
+from src.references import DeadLinkError, check_references, load_reference_index, save_reference_index
+from src.render_cache import RENDER_CACHE_PATH, RenderCache
+from src.static_files import DEFAULT_WORKERS, STRATEGIES, copy_tree, remove_stale, sync_source_files
+from src.template import load_template
+from src.watch import WatchSession, watch
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -8,30 +23,326 @@ logger.setLevel(logging.INFO)
 
 PUBLIC_PATH = "./public"
 STATIC_PATH = "./static"
+CONTENT_PATH = "./content"
+TEMPLATE_PATH = "./template.html"
+STATIC_MANIFEST_PATH = "./.cache/static_manifest.json"
+IMAGE_MANIFEST_PATH = "./.cache/image_manifest.json"
+COMPRESS_MANIFEST_PATH = "./.cache/compress_manifest.json"
+REFERENCE_INDEX_PATH = "./.cache/references.json"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site into ./public.")
+    parser.add_argument("--clean", action="store_true", help="clear the public directory and copy everything again")
+    parser.add_argument("--hash", action="store_true", help="compare content hashes when size or mtime changed")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="number of threads copying static files")
+    parser.add_argument(
+        "--strategy", choices=STRATEGIES, default="copy", help="how static files are published (falls back to copy)"
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="also publish static files as name.<hash>.ext and point page links at them",
+    )
+    parser.add_argument(
+        "--images", action="store_true", help="write resized and recompressed image variants with srcset"
+    )
+    parser.add_argument(
+        "--image-widths",
+        type=parse_widths,
+        default=DEFAULT_WIDTHS,
+        help="comma separated widths of the resized image variants",
+    )
+    parser.add_argument("--image-quality", type=int, default=DEFAULT_QUALITY, help="JPEG and WebP variant quality")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="number of processes rendering pages")
+    parser.add_argument(
+        "--async-io",
+        action="store_true",
+        help="read sources and write pages and static files concurrently while pages render",
+    )
+    parser.add_argument(
+        "--io-concurrency",
+        type=int,
+        default=DEFAULT_IO_CONCURRENCY,
+        help="maximum concurrent file reads and writes with --async-io",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="render every page without the render cache")
+    parser.add_argument(
+        "--compress", action="store_true", help="write precompressed .gz/.br/.zst variants of text assets"
+    )
+    parser.add_argument(
+        "--min-saving",
+        type=float,
+        default=DEFAULT_MIN_SAVING,
+        help="skip a compressed variant that saves less than this fraction of the file",
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="build into a hardlink-seeded copy of public and swap it in atomically when done",
+    )
+    parser.add_argument(
+        "--check-links", action="store_true", help="fail the build when a page links to a missing local file"
+    )
+    parser.add_argument("--watch", action="store_true", help="keep running and rebuild what changed")
+    parser.add_argument("--profile", metavar="REPORT", help="record per-stage timings and write a JSON report")
+    parser.add_argument("--slowest", type=int, default=DEFAULT_SLOWEST, help="number of slowest pages to report")
+    parser.add_argument("--cache-info", action="store_true", help="print render cache statistics and exit")
+    parser.add_argument("--clear-cache", action="store_true", help="remove every render cache entry and exit")
+    return parser.parse_args(argv)
+
+
+def parse_widths(value):
+    return tuple(int(width) for width in value.split(","))
 
 
-def main():
-    logger.info("Clearing public directory")
-    if os.path.exists(PUBLIC_PATH):
-        shutil.rmtree(PUBLIC_PATH)
+def main(argv=None):
+    args = parse_args(argv)
 
-    logger.info("Copying Static files and directories to Public.")
-    copy_source_files(STATIC_PATH, PUBLIC_PATH)
+    if args.cache_info or args.clear_cache:
+        manage_render_cache(RenderCache(RENDER_CACHE_PATH), clear=args.clear_cache)
+        return
 
+    if args.profile:
+        PROFILER.enable()
+        PROFILER.slowest = args.slowest
 
-def copy_source_files(source_dir_path, dest_dir_path):
-    if not os.path.exists(dest_dir_path):
-        os.mkdir(dest_dir_path)
+    staged = args.staged and not args.watch
+    ignored_in_watch = (
+        ("--fingerprint", args.fingerprint),
+        ("--images", args.images),
+        ("--staged", args.staged),
+        ("--check-links", args.check_links),
+        ("--async-io", args.async_io),
+    )
+    for flag, enabled in ignored_in_watch:
+        if enabled and args.watch:
+            logger.warning(f"{flag} is ignored in watch mode")
 
-    logger.info(f"Entering Directory: {source_dir_path}")
-    for item in os.listdir(source_dir_path):
-        source_path = os.path.join(source_dir_path, item)
-        dest_path = os.path.join(dest_dir_path, item)
-        logger.info(f"Copying: {source_path} -> {dest_path}")
-        if os.path.isfile(source_path):
-            shutil.copy(source_path, dest_path)
+    if args.clean:
+        for manifest_path in (STATIC_MANIFEST_PATH, IMAGE_MANIFEST_PATH, COMPRESS_MANIFEST_PATH):
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+        if not staged:
+            logger.info("Clearing public directory")
+            remove_public(PUBLIC_PATH)
+
+    if args.watch:
+        logger.info("Syncing Static files and directories to Public.")
+        copy_source_files(
+            STATIC_PATH,
+            PUBLIC_PATH,
+            STATIC_MANIFEST_PATH,
+            use_hash=args.hash,
+            workers=args.workers,
+            strategy=args.strategy,
+        )
+        template_path = TEMPLATE_PATH if os.path.exists(TEMPLATE_PATH) else None
+        session = WatchSession(
+            CONTENT_PATH, STATIC_PATH, PUBLIC_PATH, strategy=args.strategy, template_path=template_path
+        )
+        logger.info("Rendering content pages.")
+        session.start()
+        watch(session)
+        return
+
+    try:
+        if staged:
+            state_paths = (STATIC_MANIFEST_PATH, IMAGE_MANIFEST_PATH, COMPRESS_MANIFEST_PATH, REFERENCE_INDEX_PATH)
+            with StagedPublish(PUBLIC_PATH, seed=not args.clean, state_paths=state_paths) as dest_dir_path:
+                build_site(args, dest_dir_path)
         else:
-            copy_source_files(source_path, dest_path)
+            build_site(args, PUBLIC_PATH)
+    except (BuildError, DeadLinkError) as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    if args.profile:
+        PROFILER.write_report(args.profile)
+        logger.info(f"Wrote build profile to {args.profile}")
+
+
+def build_site(args, dest_dir_path):
+    if args.async_io:
+        page_stats = asyncio.run(build_site_async(args, dest_dir_path))
+    else:
+        publish_static_files(args, dest_dir_path)
+        page_stats = render_content_pages(args, dest_dir_path)
+
+    if args.check_links and page_stats is not None:
+        with PROFILER.stage("check_links"):
+            check_page_links(page_stats["index"], dest_dir_path)
+
+    if args.compress:
+        with PROFILER.stage("compress"):
+            compress_public_files(dest_dir_path, workers=args.workers, min_saving=args.min_saving)
+
+
+async def build_site_async(args, dest_dir_path):
+    if args.fingerprint or args.images:
+        await asyncio.to_thread(publish_static_files, args, dest_dir_path)
+        return await render_content_pages_async(args, dest_dir_path)
+    static_stats, page_stats = await asyncio.gather(
+        asyncio.to_thread(publish_static_files, args, dest_dir_path, prune=False),
+        render_content_pages_async(args, dest_dir_path, prune=False),
+    )
+    stale = static_stats["stale"] + (page_stats["stale"] if page_stats is not None else [])
+    remove_stale(stale, dest_dir_path)
+    return page_stats
+
+
+def publish_static_files(args, dest_dir_path, prune=True):
+    logger.info(f"Syncing Static files and directories to {dest_dir_path}.")
+    with PROFILER.stage("static_copy"):
+        static_stats = copy_source_files(
+            STATIC_PATH,
+            dest_dir_path,
+            STATIC_MANIFEST_PATH,
+            use_hash=args.hash,
+            workers=args.workers,
+            strategy=args.strategy,
+            fingerprint=args.fingerprint,
+            prune=prune,
+        )
+    PROFILER.count("bytes_copied", static_stats["bytes"])
+    PROFILER.count("files_copied", static_stats["copied"])
+    if args.fingerprint:
+        set_asset_manifest(static_stats["assets"])
+
+    if args.images:
+        with PROFILER.stage("images"):
+            image_stats = optimize_source_images(
+                STATIC_PATH, dest_dir_path, widths=args.image_widths, quality=args.image_quality, jobs=args.jobs
+            )
+        set_image_manifest(image_stats["manifest"])
+    return static_stats
+
+
+def page_build_options(args):
+    cache = None if args.no_cache else RenderCache(RENDER_CACHE_PATH)
+    return {
+        "jobs": args.jobs,
+        "cache": cache,
+        "template": load_template(TEMPLATE_PATH) if os.path.exists(TEMPLATE_PATH) else None,
+        "previous_index": load_reference_index(REFERENCE_INDEX_PATH),
+    }
+
+
+def render_content_pages(args, dest_dir_path):
+    if not os.path.isdir(CONTENT_PATH):
+        return None
+    logger.info("Rendering content pages.")
+    options = page_build_options(args)
+    with PROFILER.stage("pages"):
+        stats = build_pages(CONTENT_PATH, dest_dir_path, **options)
+    return finish_content_pages(args, stats)
+
+
+async def render_content_pages_async(args, dest_dir_path, prune=True):
+    if not os.path.isdir(CONTENT_PATH):
+        return None
+    logger.info(f"Rendering content pages with up to {args.io_concurrency} concurrent reads and writes.")
+    options = page_build_options(args)
+    with PROFILER.stage("pages"):
+        stats = await build_pages_async(
+            CONTENT_PATH, dest_dir_path, concurrency=args.io_concurrency, prune=prune, **options
+        )
+    return finish_content_pages(args, stats)
+
+
+def finish_content_pages(args, stats):
+    save_reference_index(REFERENCE_INDEX_PATH, stats["index"])
+    logger.info(
+        f"Pages: {stats['pages']} written ({stats['rendered']} rendered, {stats['cached']} cached), "
+        f"{stats['removed']} removed, {stats['bytes']} bytes in {stats['seconds']:.3f}s using {args.jobs} jobs"
+    )
+    return stats
+
+
+def check_page_links(pages, dest_dir_path):
+    broken = check_references(pages, dest_dir_path)
+    references = sum(len(entry["references"]) for entry in pages.values())
+    logger.info(f"Checked {references} references from {len(pages)} pages: {len(broken)} dead")
+    if broken:
+        raise DeadLinkError(broken)
+
+
+def manage_render_cache(cache, clear=False):
+    if clear:
+        cache.clear()
+        logger.info(f"Cleared render cache at {cache.cache_dir}")
+        return
+    info = cache.info()
+    logger.info(
+        f"Render cache {info['path']} (version {info['version']}): {info['entries']} entries, "
+        f"{info['bytes']} of {info['max_bytes']} bytes"
+    )
+
+
+def copy_source_files(
+    source_dir_path,
+    dest_dir_path,
+    manifest_path=None,
+    use_hash=False,
+    workers=DEFAULT_WORKERS,
+    strategy="copy",
+    fingerprint=False,
+    prune=True,
+):
+    if manifest_path is None:
+        if fingerprint:
+            raise ValueError("Fingerprinting static files needs a manifest path")
+        stats = copy_tree(source_dir_path, dest_dir_path, workers=workers, strategy=strategy)
+        logger.info(
+            f"Static {strategy}: {stats['copied']} files, {stats['bytes']} bytes copied, "
+            f"{stats['fallbacks']} fell back to copy in {stats['seconds']:.3f}s"
+        )
+        return stats
+
+    stats = sync_source_files(
+        source_dir_path,
+        dest_dir_path,
+        manifest_path,
+        use_hash=use_hash,
+        workers=workers,
+        strategy=strategy,
+        fingerprint=fingerprint,
+        prune=prune,
+    )
+    mode = "fingerprint" if fingerprint else strategy
+    logger.info(
+        f"Static sync ({mode}): {stats['copied']} published ({stats['bytes']} bytes copied, "
+        f"{stats['fallbacks']} fell back to copy), {stats['unchanged']} unchanged, "
+        f"{stats['deleted']} deleted in {stats['seconds']:.3f}s"
+    )
+    return stats
+
+
+def optimize_source_images(
+    source_dir_path, dest_dir_path, widths=DEFAULT_WIDTHS, quality=DEFAULT_QUALITY, jobs=DEFAULT_JOBS
+):
+    stats = optimize_images(
+        source_dir_path, dest_dir_path, IMAGE_MANIFEST_PATH, widths=widths, quality=quality, jobs=jobs
+    )
+    logger.info(
+        f"Images: {stats['images']} found, {stats['processed']} processed, {stats['unchanged']} unchanged, "
+        f"{stats['variants']} variants, {stats['removed']} stale removed in {stats['seconds']:.3f}s"
+    )
+    return stats
+
+
+def compress_public_files(dest_dir_path, workers=DEFAULT_WORKERS, min_saving=DEFAULT_MIN_SAVING):
+    stats = compress_tree(
+        dest_dir_path, workers=workers, min_saving=min_saving, manifest_path=COMPRESS_MANIFEST_PATH
+    )
+    PROFILER.count("bytes_compressed", stats["bytes_in"])
+    logger.info(
+        f"Compressed ({', '.join(stats['encodings'])}): {stats['written']} variants written "
+        f"({stats['bytes_in']} -> {stats['bytes_out']} bytes), {stats['up_to_date']} up to date, "
+        f"{stats['skipped']} saved less than {min_saving:.0%}, {stats['removed']} stale removed "
+        f"in {stats['seconds']:.3f}s"
+    )
+    return stats
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+import logging
+import os
+import shutil
+import time
+
+from src.static_files import LINK_FALLBACK_ERRNOS, copy_file, scan_tree
+
+logger = logging.getLogger(__name__)
+
+
+def seed_tree(source_dir_path, dest_dir_path):
+    linked = 0
+    copied = 0
+    made_dirs = set()
+    for rel_path, _ in scan_tree(source_dir_path):
+        source_path = os.path.join(source_dir_path, rel_path)
+        dest_path = os.path.join(dest_dir_path, rel_path)
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir not in made_dirs:
+            os.makedirs(dest_dir, exist_ok=True)
+            made_dirs.add(dest_dir)
+        if os.path.islink(source_path):
+            os.symlink(os.readlink(source_path), dest_path)
+            linked += 1
+            continue
+        try:
+            os.link(source_path, dest_path)
+            linked += 1
+        except OSError as e:
+            if e.errno not in LINK_FALLBACK_ERRNOS:
+                raise
+            copy_file(source_path, dest_path)
+            copied += 1
+    return {"linked": linked, "copied": copied}
+
+
+def remove_public(public_path):
+    if os.path.islink(public_path):
+        staged = StagedPublish(public_path)
+        os.unlink(public_path)
+        staged.prune(keep=set())
+    elif os.path.exists(public_path):
+        shutil.rmtree(public_path)
+
+
+class StagedPublish:
+    def __init__(self, public_path, seed=True, state_paths=()) -> None:
+        public_path = os.path.abspath(public_path)
+        self.public_path = public_path
+        self.root = os.path.dirname(public_path)
+        self.prefix = f".{os.path.basename(public_path)}-"
+        self.seed = seed
+        self.state_paths = state_paths
+        self.state = {}
+        self.path = None
+
+    def __repr__(self):
+        return f"StagedPublish({self.public_path}, staging={self.path})"
+
+    def __enter__(self):
+        return self.prepare()
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+    def prepare(self):
+        self.state = {}
+        for path in self.state_paths:
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    self.state[path] = f.read()
+            else:
+                self.state[path] = None
+
+        self.path = os.path.join(self.root, f"{self.prefix}{time.time_ns()}")
+        os.makedirs(self.path)
+        if self.seed and os.path.isdir(self.public_path):
+            stats = seed_tree(self.public_path, self.path)
+            logger.info(
+                f"Staging {self.path}: seeded {stats['linked']} hardlinks, {stats['copied']} copies "
+                f"from {self.public_path}"
+            )
+        return self.path
+
+    def current(self):
+        if os.path.islink(self.public_path):
+            return os.path.join(self.root, os.readlink(self.public_path))
+        return None
+
+    def commit(self):
+        previous = self.current()
+        if previous is None and os.path.exists(self.public_path):
+            previous = os.path.join(self.root, f"{self.prefix}{time.time_ns()}")
+            logger.info(f"Moving existing {self.public_path} aside to {previous}")
+            os.rename(self.public_path, previous)
+
+        link_path = os.path.join(self.root, f"{self.prefix}link-{os.getpid()}")
+        if os.path.lexists(link_path):
+            os.unlink(link_path)
+        os.symlink(os.path.basename(self.path), link_path)
+        os.replace(link_path, self.public_path)
+        logger.info(f"Published {self.path} as {self.public_path}")
+        self.prune(keep={self.path, previous})
+
+    def abort(self):
+        if self.path is not None and os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+        for path, data in self.state.items():
+            if data is None:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        logger.warning(f"Discarded staged build, {self.public_path} was left untouched")
+
+    def generations(self):
+        with os.scandir(self.root) as entries:
+            return sorted(
+                entry.path
+                for entry in entries
+                if entry.name.startswith(self.prefix) and entry.is_dir(follow_symlinks=False)
+            )
+
+    def prune(self, keep):
+        for path in self.generations():
+            if path not in keep:
+                logger.debug(f"Removing old generation {path}")
+                shutil.rmtree(path)
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import posixpath
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from src.static_files import scan_tree
+
+REFERENCE_INDEX_VERSION = 1
+EXTERNAL_PREFIXES = ("//", "#", "http:", "https:", "mailto:", "tel:", "data:", "ftp:")
+
+ACTIVE = ContextVar("references", default=None)
+
+
+class DeadLinkError(Exception):
+    def __init__(self, broken) -> None:
+        self.broken = broken
+        details = "\n".join(f"  {source}: {kind} {target}" for source, target, kind in broken)
+        super().__init__(f"{len(broken)} dead link(s):\n{details}")
+
+
+@contextmanager
+def collecting():
+    references = []
+    token = ACTIVE.set(references)
+    try:
+        yield references
+    finally:
+        ACTIVE.reset(token)
+
+
+def page_digest(markdown):
+    return hashlib.blake2b(markdown.encode(), digest_size=16).hexdigest()
+
+
+def index_entry(digest, references):
+    return {
+        "digest": digest,
+        "references": [{"kind": kind, "target": target} for kind, target in references],
+    }
+
+
+def load_reference_index(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != REFERENCE_INDEX_VERSION:
+        return {}
+    return data["pages"]
+
+
+def save_reference_index(path, pages):
+    index_dir = os.path.dirname(path)
+    if index_dir:
+        os.makedirs(index_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": REFERENCE_INDEX_VERSION, "pages": pages}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_local(url):
+    return bool(url) and not url.startswith(EXTERNAL_PREFIXES)
+
+
+def resolve_target(source_rel_path, url):
+    path = url.split("#", 1)[0].split("?", 1)[0]
+    if path.startswith("/"):
+        resolved = posixpath.normpath(path.lstrip("/"))
+    else:
+        page_dir = posixpath.dirname(source_rel_path.replace(os.sep, "/"))
+        resolved = posixpath.normpath(posixpath.join(page_dir, path))
+    if resolved == ".":
+        return ""
+    return resolved
+
+
+def output_files(dest_dir_path):
+    return {rel_path.replace(os.sep, "/") for rel_path, _ in scan_tree(dest_dir_path)}
+
+
+def target_exists(target, files):
+    if target in files:
+        return True
+    if target == "":
+        return "index.html" in files
+    return f"{target}/index.html" in files or f"{target}.html" in files
+
+
+def check_references(pages, dest_dir_path):
+    files = output_files(dest_dir_path)
+    broken = []
+    for source, entry in pages.items():
+        for reference in entry["references"]:
+            url = reference["target"]
+            if not is_local(url):
+                continue
+            target = resolve_target(source, url)
+            if target.startswith("../") or not target_exists(target, files):
+                broken.append((source, url, reference["kind"]))
+    return sorted(broken)
@@ -0,0 +1,131 @@
+import hashlib
+import logging
+import os
+import shutil
+
+from src import __version__
+from src.block_markdown import markdown_to_html
+from src.text_node import url_rewrite_version
+
+logger = logging.getLogger(__name__)
+
+RENDER_CACHE_PATH = "./.cache/render"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+EVICT_TO_RATIO = 0.9
+
+
+class RenderCache:
+    def __init__(self, cache_dir=RENDER_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, version=__version__) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._entries = None
+        self._bytes = 0
+
+    def __repr__(self):
+        return f"RenderCache({self.cache_dir}, max_bytes={self.max_bytes}, version={self.version})"
+
+    def key(self, markdown):
+        digest = hashlib.sha256(self.version.encode())
+        digest.update(b"\0")
+        digest.update(url_rewrite_version().encode())
+        digest.update(b"\0")
+        digest.update(markdown.encode())
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.html")
+
+    def get(self, markdown):
+        path = self.entry_path(self.key(markdown))
+        try:
+            with open(path, encoding="utf-8") as f:
+                html = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        os.utime(path)
+        if self._entries is not None and path in self._entries:
+            self._entries[path] = (self._entries[path][0], os.stat(path).st_mtime_ns)
+        self.hits += 1
+        return html
+
+    def put(self, markdown, html):
+        path = self.entry_path(self.key(markdown))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+
+        entries = self.entries()
+        stat = os.stat(path)
+        previous = entries.get(path)
+        if previous is not None:
+            self._bytes -= previous[0]
+        entries[path] = (stat.st_size, stat.st_mtime_ns)
+        self._bytes += stat.st_size
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def render(self, markdown):
+        html = self.get(markdown)
+        if html is None:
+            html = markdown_to_html(markdown)
+            self.put(markdown, html)
+        return html
+
+    def entries(self):
+        if self._entries is None:
+            self._entries = {}
+            self._bytes = 0
+            if os.path.isdir(self.cache_dir):
+                for dir_path, _, file_names in os.walk(self.cache_dir):
+                    for file_name in file_names:
+                        if not file_name.endswith(".html"):
+                            continue
+                        path = os.path.join(dir_path, file_name)
+                        stat = os.stat(path)
+                        self._entries[path] = (stat.st_size, stat.st_mtime_ns)
+                        self._bytes += stat.st_size
+        return self._entries
+
+    def total_bytes(self):
+        self.entries()
+        return self._bytes
+
+    def evict(self):
+        entries = self.entries()
+        total = self._bytes
+        target = self.max_bytes * EVICT_TO_RATIO
+        evicted = 0
+        for path in sorted(entries, key=lambda entry_path: entries[entry_path][1]):
+            if total <= target:
+                break
+            size, _ = entries.pop(path)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        self._bytes = total
+        logger.debug(f"Evicted {evicted} render cache entries")
+        return evicted
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+        self._entries = {}
+        self._bytes = 0
+
+    def info(self):
+        return {
+            "path": self.cache_dir,
+            "version": self.version,
+            "entries": len(self.entries()),
+            "bytes": self.total_bytes(),
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,347 @@
+import errno
+import hashlib
+import json
+import logging
+import mmap
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from src.fingerprint import ASSET_MANIFEST_NAME, fingerprinted_path, save_asset_manifest
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+ZERO_COPY_CHUNK = 1 << 30
+HASH_COPY_BUFFER = 1 << 20
+MMAP_THRESHOLD = 4 << 20
+ZERO_COPY_FALLBACK_ERRNOS = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EBADF, errno.EOPNOTSUPP, errno.ENOTSUP}
+LINK_FALLBACK_ERRNOS = ZERO_COPY_FALLBACK_ERRNOS | {errno.EPERM, errno.EACCES, errno.EMLINK, errno.ENOTTY}
+FICLONE = 0x40049409
+STRATEGIES = ("copy", "hardlink", "reflink", "symlink")
+
+
+def load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f).get("files", {})
+
+
+def save_manifest(manifest_path, files):
+    manifest_dir = os.path.dirname(manifest_path)
+    if manifest_dir:
+        os.makedirs(manifest_dir, exist_ok=True)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"files": files}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+@contextmanager
+def mapped_file(path, sequential=True):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if sequential and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            yield mapped
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    with mapped_file(path) as mapped:
+        return hashlib.sha256(mapped).hexdigest()
+
+
+def scan_tree(source_dir_path):
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        with os.scandir(os.path.join(source_dir_path, rel_dir)) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name)
+                if entry.is_dir():
+                    pending.append(rel_path)
+                elif entry.is_file():
+                    yield rel_path, entry.stat()
+
+
+def _copy_file_range(source_fd, dest_fd, offset):
+    return os.copy_file_range(source_fd, dest_fd, ZERO_COPY_CHUNK, offset, offset)
+
+
+def _sendfile(source_fd, dest_fd, offset):
+    return os.sendfile(dest_fd, source_fd, offset, ZERO_COPY_CHUNK)
+
+
+ZERO_COPY_METHODS = [
+    method
+    for method, available in (
+        (_copy_file_range, hasattr(os, "copy_file_range")),
+        (_sendfile, hasattr(os, "sendfile")),
+    )
+    if available
+]
+
+
+def zero_copy(source_fd, dest_fd):
+    copied = 0
+    for copy_range in ZERO_COPY_METHODS:
+        try:
+            while True:
+                sent = copy_range(source_fd, dest_fd, copied)
+                if sent == 0:
+                    return copied
+                copied += sent
+        except OSError as e:
+            if copied or e.errno not in ZERO_COPY_FALLBACK_ERRNOS:
+                raise
+    return None
+
+
+def copy_file(source_path, dest_path):
+    with open(source_path, "rb") as source, open(dest_path, "wb") as dest:
+        copied = zero_copy(source.fileno(), dest.fileno())
+        if copied is None:
+            shutil.copyfileobj(source, dest)
+            copied = dest.tell()
+    shutil.copymode(source_path, dest_path)
+    return copied
+
+
+def hash_copy_file(source_path, dest_path):
+    digest = hashlib.sha256()
+    buffer = bytearray(HASH_COPY_BUFFER)
+    view = memoryview(buffer)
+    copied = 0
+    with open(source_path, "rb") as source, open(dest_path, "wb") as dest:
+        while read := source.readinto(buffer):
+            chunk = view[:read]
+            digest.update(chunk)
+            dest.write(chunk)
+            copied += read
+    shutil.copymode(source_path, dest_path)
+    return digest.hexdigest(), copied
+
+
+def reflink_file(source_path, dest_path):
+    if fcntl is None:
+        raise OSError(errno.ENOTSUP, "reflinks are not supported on this platform")
+    with open(source_path, "rb") as source, open(dest_path, "wb") as dest:
+        try:
+            fcntl.ioctl(dest.fileno(), FICLONE, source.fileno())
+        except OSError:
+            dest.close()
+            os.unlink(dest_path)
+            raise
+
+
+def link_file(source_path, dest_path, strategy):
+    if strategy == "hardlink":
+        os.link(source_path, dest_path)
+    elif strategy == "reflink":
+        reflink_file(source_path, dest_path)
+    elif strategy == "symlink":
+        os.symlink(os.path.abspath(source_path), dest_path)
+    else:
+        raise ValueError(f"Unknown publish strategy: {strategy}")
+
+
+def publish_file(source_path, dest_path, strategy="copy"):
+    if os.path.lexists(dest_path):
+        os.unlink(dest_path)
+    if strategy != "copy":
+        try:
+            link_file(source_path, dest_path, strategy)
+            return 0, False
+        except OSError as e:
+            if e.errno not in LINK_FALLBACK_ERRNOS:
+                raise
+            logger.debug(f"{strategy} failed for {dest_path} ({e.strerror}), copying instead")
+            return copy_file(source_path, dest_path), True
+    return copy_file(source_path, dest_path), False
+
+
+def publish_fingerprinted(source_path, dest_path):
+    if os.path.lexists(dest_path):
+        os.unlink(dest_path)
+    digest, copied = hash_copy_file(source_path, dest_path)
+    hashed_path = fingerprinted_path(dest_path, digest)
+    if os.path.lexists(hashed_path):
+        os.unlink(hashed_path)
+    try:
+        os.link(dest_path, hashed_path)
+        return digest, copied, False
+    except OSError as e:
+        if e.errno not in LINK_FALLBACK_ERRNOS:
+            raise
+        return digest, copied + copy_file(dest_path, hashed_path), True
+
+
+def make_dest_dirs(pairs):
+    made_dirs = set()
+    for _, dest_path in pairs:
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir not in made_dirs:
+            os.makedirs(dest_dir, exist_ok=True)
+            made_dirs.add(dest_dir)
+
+
+def map_workers(func, items, workers=DEFAULT_WORKERS):
+    if workers <= 1 or len(items) <= 1:
+        return list(map(func, items))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items))
+
+
+def copy_files(pairs, workers=DEFAULT_WORKERS, strategy="copy"):
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown publish strategy: {strategy}")
+    make_dest_dirs(pairs)
+
+    def publish(pair):
+        return publish_file(pair[0], pair[1], strategy)
+
+    results = map_workers(publish, pairs, workers)
+    return {
+        "bytes": sum(copied for copied, _ in results),
+        "fallbacks": sum(1 for _, fell_back in results if fell_back),
+    }
+
+
+def copy_tree(source_dir_path, dest_dir_path, workers=DEFAULT_WORKERS, strategy="copy"):
+    start = time.perf_counter()
+    os.makedirs(dest_dir_path, exist_ok=True)
+    pairs = [
+        (os.path.join(source_dir_path, rel_path), os.path.join(dest_dir_path, rel_path))
+        for rel_path, _ in scan_tree(source_dir_path)
+    ]
+    stats = copy_files(pairs, workers, strategy)
+    stats["copied"] = len(pairs)
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def is_unchanged(previous, current):
+    if previous is None:
+        return False
+    if previous["size"] == current["size"] and previous["mtime"] == current["mtime"]:
+        return True
+    return "hash" in current and previous.get("hash") == current["hash"]
+
+
+def remove_empty_dirs(dir_path, root_path):
+    root_path = os.path.abspath(root_path)
+    dir_path = os.path.abspath(dir_path)
+    while dir_path != root_path and dir_path.startswith(root_path):
+        if os.listdir(dir_path):
+            return
+        os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
+
+
+def sync_source_files(
+    source_dir_path,
+    dest_dir_path,
+    manifest_path,
+    use_hash=False,
+    workers=DEFAULT_WORKERS,
+    strategy="copy",
+    fingerprint=False,
+    prune=True,
+):
+    start = time.perf_counter()
+    previous_files = load_manifest(manifest_path)
+    current_files = {}
+    to_copy = []
+    stats = {"copied": 0, "unchanged": 0, "deleted": 0}
+    mode = "fingerprint" if fingerprint else strategy
+
+    os.makedirs(dest_dir_path, exist_ok=True)
+    for rel_path, stat in scan_tree(source_dir_path):
+        source_path = os.path.join(source_dir_path, rel_path)
+        dest_path = os.path.join(dest_dir_path, rel_path)
+        previous = previous_files.get(rel_path)
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "strategy": mode}
+        if use_hash:
+            if previous is not None and "hash" in previous and is_unchanged(previous, entry):
+                entry["hash"] = previous["hash"]
+            else:
+                entry["hash"] = file_digest(source_path)
+
+        same_strategy = previous is not None and previous.get("strategy", "copy") == mode
+        published = os.path.exists(dest_path)
+        if published and fingerprint and same_strategy:
+            published = os.path.exists(os.path.join(dest_dir_path, previous["fingerprint"]))
+        if same_strategy and published and is_unchanged(previous, entry):
+            stats["unchanged"] += 1
+            if fingerprint:
+                entry["fingerprint"] = previous["fingerprint"]
+        else:
+            logger.debug(f"Copying: {source_path} -> {dest_path}")
+            to_copy.append((rel_path, source_path, dest_path))
+        current_files[rel_path] = entry
+
+    pairs = [(source_path, dest_path) for _, source_path, dest_path in to_copy]
+    if fingerprint:
+        make_dest_dirs(pairs)
+        results = map_workers(lambda pair: publish_fingerprinted(*pair), pairs, workers)
+        for (rel_path, _, _), (digest, _, _) in zip(to_copy, results):
+            current_files[rel_path]["fingerprint"] = fingerprinted_path(rel_path, digest)
+        stats["bytes"] = sum(copied for _, copied, _ in results)
+        stats["fallbacks"] = sum(1 for _, _, fell_back in results if fell_back)
+    else:
+        stats.update(copy_files(pairs, workers, strategy))
+    stats["copied"] = len(to_copy)
+
+    stale = []
+    for rel_path, previous in previous_files.items():
+        old_fingerprint = previous.get("fingerprint")
+        if old_fingerprint and old_fingerprint != current_files.get(rel_path, {}).get("fingerprint"):
+            stale.append(os.path.join(dest_dir_path, old_fingerprint))
+
+    for rel_path in sorted(previous_files.keys() - current_files.keys()):
+        stale.append(os.path.join(dest_dir_path, rel_path))
+        stats["deleted"] += 1
+    if prune:
+        remove_stale(stale, dest_dir_path)
+    else:
+        stats["stale"] = stale
+
+    asset_manifest_path = os.path.join(dest_dir_path, ASSET_MANIFEST_NAME)
+    if fingerprint:
+        stats["assets"] = {
+            rel_path.replace(os.sep, "/"): entry["fingerprint"].replace(os.sep, "/")
+            for rel_path, entry in sorted(current_files.items())
+        }
+        save_asset_manifest(asset_manifest_path, stats["assets"])
+    elif ASSET_MANIFEST_NAME not in current_files and os.path.exists(asset_manifest_path):
+        os.remove(asset_manifest_path)
+
+    save_manifest(manifest_path, current_files)
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def remove_stale(paths, dest_dir_path):
+    for path in paths:
+        logger.debug(f"Removing: {path}")
+        remove_published(path, dest_dir_path)
+
+
+def remove_published(dest_path, dest_dir_path):
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+        remove_empty_dirs(os.path.dirname(dest_path), dest_dir_path)
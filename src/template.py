@@ -0,0 +1,65 @@
+import os
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+TITLE_PATTERN = re.compile(r"^# (.+?)\s*$", re.MULTILINE)
+
+
+class Template:
+    def __init__(self, source) -> None:
+        self.parts = PLACEHOLDER_PATTERN.split(source)
+        self.placeholders = [(i, self.parts[i]) for i in range(1, len(self.parts), 2)]
+
+    def __repr__(self):
+        return f"Template(placeholders: {[name for _, name in self.placeholders]})"
+
+    def render(self, values):
+        parts = self.parts.copy()
+        for i, name in self.placeholders:
+            parts[i] = values.get(name, "")
+        return "".join(parts)
+
+    def write(self, fp, values, streams=None):
+        streams = streams or {}
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0:
+                fp.write(part)
+            elif part in streams:
+                streams[part](fp)
+            else:
+                fp.write(values.get(part, ""))
+
+
+class TemplateCache:
+    def __init__(self) -> None:
+        self.templates = {}
+
+    def load(self, path):
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self.templates.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with open(path, encoding="utf-8") as f:
+            template = Template(f.read())
+        self.templates[path] = (version, template)
+        return template
+
+
+TEMPLATES = TemplateCache()
+
+
+def load_template(path):
+    return TEMPLATES.load(path)
+
+
+def extract_title(markdown):
+    match = TITLE_PATTERN.search(markdown)
+    return match.group(1) if match else None
+
+
+def extract_title_from_lines(lines):
+    for line in lines:
+        if line.startswith("# "):
+            return line[2:].strip()
+    return None
@@ -1,6 +1,8 @@
 from enum import Enum
 
+from src.fingerprint import asset_manifest_version, asset_url
 from src.html_node import LeafNode
+from src.images import image_attributes, image_manifest_version
 
 
 class TextType(Enum):
@@ -13,6 +15,8 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None) -> None:
         self.text = text
         self.text_type = text_type
@@ -26,16 +30,35 @@ class TextNode:
 
 
 def text_node_to_html_node(text_node: TextNode) -> LeafNode:
-    if text_node.text_type == TextType.TEXT:
-        return LeafNode(None, text_node.text)
-    if text_node.text_type == TextType.BOLD:
-        return LeafNode("b", text_node.text)
-    if text_node.text_type == TextType.ITALIC:
-        return LeafNode("i", text_node.text)
-    if text_node.text_type == TextType.CODE:
-        return LeafNode("code", text_node.text)
-    if text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
-    if text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", None, {"src": text_node.url, "alt": text_node.text})
+    text_type = text_node.text_type
+    if text_type in TEXT_NODE_TAGS:
+        return LeafNode(TEXT_NODE_TAGS[text_type], text_node.text)
+    if text_type is TextType.LINK:
+        return LeafNode("a", text_node.text, {"href": asset_url(text_node.url)})
+    if text_type is TextType.IMAGE:
+        return LeafNode("img", None, image_props(text_node.text, text_node.url))
     raise Exception("Invalid TextType")
+
+
+def image_props(alt, url):
+    props = {"src": asset_url(url), "alt": alt}
+    attributes = image_attributes(url)
+    if attributes:
+        props.update(attributes)
+    return props
+
+
+def url_rewrite_version():
+    return f"{asset_manifest_version()}+{image_manifest_version()}"
+
+
+def link_html(text, url):
+    return f'<a href="{asset_url(url)}">{text}</a>'
+
+
+def image_html(alt, url):
+    attributes = "".join([f' {attribute}="{value}"' for attribute, value in image_props(alt, url).items()])
+    return f"<img{attributes}>"
+
+
+TEXT_NODE_TAGS = {TextType.TEXT: None, TextType.BOLD: "b", TextType.ITALIC: "i", TextType.CODE: "code"}
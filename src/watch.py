@@ -0,0 +1,306 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+from collections import defaultdict
+
+from src.block_memo import BlockMemo
+from src.build import assemble_page, find_content_files, output_path_for, page_title, write_page
+from src.static_files import publish_file, remove_empty_dirs, scan_tree
+from src.template import load_template
+
+logger = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+DEBOUNCE_SECONDS = 0.05
+POLL_INTERVAL = 0.5
+
+
+class InotifyWatcher:
+    def __init__(self, roots) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.watches = {}
+        self.file_filters = {}
+        for root in roots:
+            if os.path.isfile(root):
+                self.watch_file(root)
+            else:
+                self.watch_tree(root)
+
+    def watch_tree(self, root):
+        for dir_path, _, _ in os.walk(root):
+            wd = self._add_watch(self.fd, os.fsencode(dir_path), WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = dir_path
+                self.file_filters.pop(wd, None)
+
+    def watch_file(self, path):
+        dir_path, file_name = os.path.split(os.path.abspath(path))
+        wd = self._add_watch(self.fd, os.fsencode(dir_path), WATCH_MASK)
+        if wd < 0:
+            return
+        if wd not in self.watches:
+            self.watches[wd] = dir_path
+            self.file_filters[wd] = {file_name}
+        elif wd in self.file_filters:
+            self.file_filters[wd].add(file_name)
+
+    def wait(self, timeout=None):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = self.read_events()
+        while True:
+            ready, _, _ = select.select([self.fd], [], [], DEBOUNCE_SECONDS)
+            if not ready:
+                return changed
+            changed |= self.read_events()
+
+    def read_events(self):
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset : offset + name_length].rstrip(b"\0")
+            offset += name_length
+            dir_path = self.watches.get(wd)
+            if dir_path is None or not name:
+                continue
+            name = os.fsdecode(name)
+            if wd in self.file_filters and name not in self.file_filters[wd]:
+                continue
+            path = os.path.join(dir_path, name)
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self.watch_tree(path)
+                changed.update(os.path.join(path, rel_path) for rel_path, _ in scan_tree(path))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    def __init__(self, roots, interval=POLL_INTERVAL) -> None:
+        self.roots = roots
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self):
+        snapshot = {}
+        for root in self.roots:
+            if os.path.isfile(root):
+                stat = os.stat(root)
+                snapshot[root] = (stat.st_mtime_ns, stat.st_size)
+                continue
+            for rel_path, stat in scan_tree(root):
+                snapshot[os.path.join(root, rel_path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval)
+            snapshot = self.take_snapshot()
+            changed = {
+                path for path in snapshot.keys() | self.snapshot.keys() if snapshot.get(path) != self.snapshot.get(path)
+            }
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def create_watcher(roots):
+    try:
+        return InotifyWatcher(roots)
+    except (OSError, AttributeError, TypeError) as e:
+        logger.info(f"inotify unavailable ({e}), polling every {POLL_INTERVAL}s")
+        return PollingWatcher(roots)
+
+
+class DependencyGraph:
+    def __init__(self) -> None:
+        self.inputs = {}
+        self.dependents = defaultdict(set)
+
+    def add(self, output, inputs):
+        self.remove(output)
+        self.inputs[output] = set(inputs)
+        for input_path in inputs:
+            self.dependents[input_path].add(output)
+
+    def remove(self, output):
+        for input_path in self.inputs.pop(output, ()):
+            self.dependents[input_path].discard(output)
+            if not self.dependents[input_path]:
+                del self.dependents[input_path]
+
+    def affected(self, changed):
+        outputs = set()
+        for path in changed:
+            if path in self.dependents:
+                outputs.update(self.dependents[path])
+            elif not os.path.exists(path):
+                prefix = path + os.sep
+                for input_path, dependents in self.dependents.items():
+                    if input_path.startswith(prefix):
+                        outputs.update(dependents)
+        return outputs
+
+
+class WatchSession:
+    def __init__(
+        self, content_dir_path, static_dir_path, dest_dir_path, strategy="copy", memo=None, template_path=None
+    ) -> None:
+        self.content_dir_path = os.path.abspath(content_dir_path)
+        self.static_dir_path = os.path.abspath(static_dir_path)
+        self.dest_dir_path = os.path.abspath(dest_dir_path)
+        self.template_path = os.path.abspath(template_path) if template_path else None
+        self.strategy = strategy
+        self.memo = memo if memo is not None else BlockMemo()
+        self.graph = DependencyGraph()
+        self.pages = {}
+        self.assets = {}
+
+    def roots(self):
+        roots = [path for path in (self.content_dir_path, self.static_dir_path) if os.path.isdir(path)]
+        if self.template_path is not None:
+            roots.append(self.template_path)
+        return roots
+
+    def start(self):
+        if os.path.isdir(self.static_dir_path):
+            for rel_path, _ in scan_tree(self.static_dir_path):
+                self.track_asset(os.path.join(self.static_dir_path, rel_path))
+        if os.path.isdir(self.content_dir_path):
+            for rel_path in find_content_files(self.content_dir_path):
+                source_path = os.path.join(self.content_dir_path, rel_path)
+                try:
+                    self.render_page(source_path)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Failed to render {source_path}: {e}")
+
+    def track_asset(self, source_path):
+        rel_path = os.path.relpath(source_path, self.static_dir_path)
+        dest_path = os.path.join(self.dest_dir_path, rel_path)
+        self.assets[dest_path] = source_path
+        self.graph.add(dest_path, [source_path])
+        return dest_path
+
+    def publish_asset(self, source_path):
+        dest_path = self.track_asset(source_path)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        publish_file(source_path, dest_path, self.strategy)
+
+    def render_page(self, source_path):
+        rel_path = os.path.relpath(source_path, self.content_dir_path)
+        dest_path = os.path.join(self.dest_dir_path, output_path_for(rel_path))
+        self.pages[dest_path] = source_path
+        if self.template_path is None:
+            self.graph.add(dest_path, [source_path])
+        else:
+            self.graph.add(dest_path, [source_path, self.template_path])
+        with open(source_path, encoding="utf-8") as f:
+            markdown = f.read()
+        if self.template_path is None:
+            write_page(dest_path, self.memo.render(markdown))
+            return
+        template = load_template(self.template_path)
+        write_page(dest_path, assemble_page(template, page_title(markdown, rel_path), self.memo.render(markdown)))
+
+    def remove_output(self, dest_path):
+        self.graph.remove(dest_path)
+        self.pages.pop(dest_path, None)
+        self.assets.pop(dest_path, None)
+        if os.path.lexists(dest_path):
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), self.dest_dir_path)
+
+    def is_page_source(self, path):
+        return path.startswith(self.content_dir_path + os.sep) and path.endswith(".md")
+
+    def is_asset_source(self, path):
+        return path.startswith(self.static_dir_path + os.sep)
+
+    def rebuild(self, changed):
+        start = time.perf_counter()
+        changed = {os.path.abspath(path) for path in changed}
+        stats = {"pages": 0, "assets": 0, "removed": 0, "errors": 0}
+
+        sources = {
+            path
+            for path in changed
+            if os.path.isfile(path) and (self.is_page_source(path) or self.is_asset_source(path))
+        }
+        for output in self.graph.affected(changed):
+            source_path = self.pages.get(output) or self.assets[output]
+            if os.path.exists(source_path):
+                sources.add(source_path)
+            else:
+                self.remove_output(output)
+                stats["removed"] += 1
+
+        for source_path in sorted(sources):
+            try:
+                if self.is_page_source(source_path):
+                    self.render_page(source_path)
+                    stats["pages"] += 1
+                else:
+                    self.publish_asset(source_path)
+                    stats["assets"] += 1
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to rebuild {source_path}: {e}")
+                stats["errors"] += 1
+
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+
+def watch(session, watcher=None):
+    watcher = watcher or create_watcher(session.roots())
+    logger.info(f"Watching {', '.join(session.roots())} for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            changed = watcher.wait()
+            if not changed:
+                continue
+            stats = session.rebuild(changed)
+            memo = session.memo.stats()
+            logger.info(
+                f"Rebuilt {stats['pages']} page(s), {stats['assets']} asset(s), removed {stats['removed']}, "
+                f"{stats['errors']} error(s) in {stats['seconds'] * 1000:.1f} ms "
+                f"(block memo hit rate {memo['hit_rate']:.0%})"
+            )
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+    finally:
+        watcher.close()
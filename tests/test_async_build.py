@@ -0,0 +1,111 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from src.async_build import build_pages_async
+from src.build import BuildError, build_pages
+from src.render_cache import RenderCache
+from src.template import Template
+
+
+class TestBuildPagesAsync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write("index.md", "# Home\n\nWelcome to [the blog](/blog/post0.html)")
+        for i in range(12):
+            self.write(os.path.join("blog", f"post{i}.md"), f"## Post {i}\n\n- item _{i}_\n- ![img](/{i}.png)")
+        self.write("notes.txt", "not markdown")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, content):
+        with open(os.path.join(self.content, rel_path), "w") as f:
+            f.write(content)
+
+    def read_tree(self, root):
+        files = {}
+        for dir_path, _, file_names in os.walk(root):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def build(self, name, **kwargs):
+        return asyncio.run(build_pages_async(self.content, os.path.join(self.tmp.name, name), **kwargs))
+
+    def test_matches_sync_build(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        expected = build_pages(self.content, os.path.join(self.tmp.name, "sync"), jobs=1, template=template)
+        for name, kwargs in (
+            ("serial", {"jobs": 1, "concurrency": 1}),
+            ("parallel", {"jobs": 2, "chunk_size": 3, "concurrency": 4}),
+            ("streamed", {"jobs": 2, "stream_threshold": 0}),
+        ):
+            stats = self.build(name, template=template, **kwargs)
+            self.assertEqual(
+                self.read_tree(os.path.join(self.tmp.name, "sync")), self.read_tree(os.path.join(self.tmp.name, name))
+            )
+            self.assertEqual(expected["bytes"], stats["bytes"], name)
+            if name != "streamed":
+                self.assertEqual(expected["index"], stats["index"], name)
+        self.assertEqual((13, 0), (stats["streamed"], stats["rendered"]))
+        self.assertEqual(
+            [entry["references"] for entry in expected["index"].values()],
+            [entry["references"] for entry in stats["index"].values()],
+        )
+
+    def test_serial_index_matches_sync_with_many_link_pages(self):
+        for i in range(200):
+            links = " ".join(f"[l{j}](/blog/post{i}-{j}.html) ![i{j}](/img/{i}-{j}.png)" for j in range(40))
+            self.write(os.path.join("blog", f"links{i}.md"), f"# Links {i}\n\n{links}")
+        expected = build_pages(self.content, os.path.join(self.tmp.name, "sync"), jobs=1)
+        stats = self.build("async", jobs=1, chunk_size=4)
+        self.assertEqual(expected["index"], stats["index"])
+        streamed = self.build("streamed", jobs=1, stream_threshold=0)
+        self.assertEqual(
+            [entry["references"] for entry in expected["index"].values()],
+            [entry["references"] for entry in streamed["index"].values()],
+        )
+
+    def test_cache_hits(self):
+        cache = RenderCache(os.path.join(self.tmp.name, "cache"))
+        first = self.build("first", jobs=1, cache=cache)
+        self.assertEqual((13, 0), (first["rendered"], first["cached"]))
+        stats = self.build("second", jobs=1, cache=cache, previous_index=first["index"])
+        self.assertEqual((0, 13, 13), (stats["rendered"], stats["cached"], stats["pages"]))
+        self.assertEqual(
+            self.read_tree(os.path.join(self.tmp.name, "first")), self.read_tree(os.path.join(self.tmp.name, "second"))
+        )
+
+    def test_deleted_pages_are_removed(self):
+        first = self.build("public", jobs=1)
+        os.remove(os.path.join(self.content, "blog", "post3.md"))
+        stats = self.build("public", jobs=1, previous_index=first["index"])
+        self.assertEqual((1, 12), (stats["removed"], stats["pages"]))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "public", "blog", "post3.html")))
+        self.assertNotIn(os.path.join("blog", "post3.md"), stats["index"])
+
+    def test_deferred_page_removal(self):
+        first = self.build("public", jobs=1)
+        os.remove(os.path.join(self.content, "blog", "post3.md"))
+        stats = self.build("public", jobs=1, previous_index=first["index"], prune=False)
+        stale_path = os.path.join(self.tmp.name, "public", "blog", "post3.html")
+        self.assertEqual((1, [stale_path]), (stats["removed"], stats["stale"]))
+        self.assertTrue(os.path.exists(stale_path))
+
+    def test_errors_are_sorted_and_complete(self):
+        self.write(os.path.join("blog", "post9.md"), "broken **bold")
+        self.write("bad.md", "broken _italic")
+        with self.assertRaises(BuildError) as raised:
+            self.build("public", jobs=1, chunk_size=1)
+        self.assertEqual(["bad.md", os.path.join("blog", "post9.md")], [path for path, _ in raised.exception.errors])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "public", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
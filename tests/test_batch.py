@@ -0,0 +1,72 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.batch import render_many, render_many_async
+from src.block_markdown import markdown_to_html
+from src.block_memo import BlockMemo
+
+SOURCES = [
+    ("a.md", "# Title\n\nSome **bold** [link](/a)"),
+    ("b.md", "# Title\n\n- one\n- two"),
+    ("c.md", "plain _text_"),
+    ("d.md", ""),
+]
+
+
+class TestRenderMany(unittest.TestCase):
+    def test_matches_markdown_to_html(self):
+        expected = [(key, markdown_to_html(markdown)) for key, markdown in SOURCES]
+        self.assertEqual(expected, list(render_many(SOURCES)))
+
+    def test_shares_memo_across_documents(self):
+        memo = BlockMemo()
+        list(render_many(SOURCES, memo=memo))
+        self.assertEqual(1, memo.hits)
+
+    def test_error_names_document(self):
+        rendered = render_many([("ok.md", "fine"), ("bad.md", "**open")])
+        self.assertEqual("ok.md", next(rendered)[0])
+        with self.assertRaises(ValueError) as context:
+            next(rendered)
+        self.assertEqual(["while rendering bad.md"], context.exception.__notes__)
+
+
+class TestRenderManyAsync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for name, markdown in SOURCES:
+            path = os.path.join(self.tmp.name, name)
+            with open(path, "w") as f:
+                f.write(markdown)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def collect(self, paths, **kwargs):
+        async def run():
+            return [result async for result in render_many_async(paths, **kwargs)]
+
+        return asyncio.run(run())
+
+    def test_matches_sync_in_order(self):
+        expected = [(path, markdown_to_html(markdown)) for path, (_, markdown) in zip(self.paths, SOURCES)]
+        self.assertEqual(expected, self.collect(self.paths, read_ahead=2))
+        self.assertEqual(expected, self.collect(self.paths, batch_size=1, read_ahead=0))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertEqual(expected, self.collect(self.paths, executor=executor))
+        memo = BlockMemo()
+        self.assertEqual(expected, self.collect(self.paths, memo=memo))
+        self.assertEqual(1, memo.hits)
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self.collect(self.paths[:1] + [os.path.join(self.tmp.name, "missing.md")] + self.paths[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
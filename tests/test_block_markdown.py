@@ -1,13 +1,22 @@
+import io
 import unittest
 
 from src.block_markdown import (
     BlockType,
+    MarkdownDocument,
     all_lines_start_with,
     block_to_block_type,
+    block_to_html,
     block_to_html_node,
     is_ordered_list,
     markdown_to_blocks,
+    markdown_to_html,
     markdown_to_html_node,
+    scan_blocks,
+    scan_lines,
+    scan_mapped,
+    stream_mapped_to_html,
+    stream_markdown_to_html,
 )
 
 
@@ -53,6 +62,141 @@ this is the 6th line
             ],
         )
 
+    def test_scan_blocks_types(self):
+        markdown = """
+# Heading
+
+>quote
+>more
+
+- one
+- two
+
+1. one
+2. two
+
+```
+code
+```
+
+plain text
+"""
+        self.assertEqual(
+            [
+                BlockType.HEADING,
+                BlockType.QUOTE,
+                BlockType.ULIST,
+                BlockType.OLIST,
+                BlockType.CODE,
+                BlockType.PARAGRAPH,
+            ],
+            [block_type for block_type, _ in scan_blocks(markdown)],
+        )
+
+    def test_scan_blocks_matches_block_to_block_type(self):
+        markdown = "1. one\n3. three\n\n- one\nnot a list\n\n```one line```\n\n####### seven"
+        for block_type, block in scan_blocks(markdown):
+            with self.subTest(block):
+                self.assertEqual(block_to_block_type(block), block_type)
+
+    def test_scan_blocks_fenced_code_with_blank_lines(self):
+        markdown = "intro\n\n```\nfirst\n\n\nsecond\n```\n\noutro"
+        self.assertEqual(
+            [
+                (BlockType.PARAGRAPH, "intro"),
+                (BlockType.CODE, "```\nfirst\n\n\nsecond\n```"),
+                (BlockType.PARAGRAPH, "outro"),
+            ],
+            list(scan_blocks(markdown)),
+        )
+
+    def test_scan_blocks_unterminated_fence(self):
+        markdown = "```\nnot closed\n\nparagraph\n\n```\nalso open"
+        self.assertEqual(
+            [
+                (BlockType.PARAGRAPH, "```\nnot closed"),
+                (BlockType.PARAGRAPH, "paragraph"),
+                (BlockType.PARAGRAPH, "```\nalso open"),
+            ],
+            list(scan_blocks(markdown)),
+        )
+
+    def test_scan_lines_matches_scan_blocks(self):
+        markdowns = [
+            "a\n\n\nb\n\n\n\nc\n  \nd",
+            "\n\n# Heading\n\n```\ncode\n\n\nmore\n```\n\n- a\n- b\n\n",
+            "```\nunterminated\n\n```also\n\npara",
+            "1. one\n2. two\n\n>quote\n>more\n",
+        ]
+        for markdown in markdowns:
+            with self.subTest(markdown):
+                lines = io.StringIO(markdown)
+                self.assertEqual(list(scan_blocks(markdown)), list(scan_lines(lines)))
+
+    def test_stream_markdown_to_html(self):
+        markdown = "# Title\n\nSome **bold** text\n\n```\ncode\n\nblock\n```\n\n- a\n- b\n"
+        out = io.StringIO()
+        stream_markdown_to_html(io.StringIO(markdown), out)
+        self.assertEqual(markdown_to_html_node(markdown).to_html(), out.getvalue())
+
+    def test_scan_mapped_matches_scan_blocks(self):
+        markdowns = [
+            "",
+            "\n\n\n",
+            "# Title\n\nSome **bold** text\n\n\n\nafter gap",
+            "```\ncode\n\nblock\n```\n\n- a\n- b\n",
+            "```\nunclosed\n\nfence",
+            "caf\u00e9 \u2014 \u65e5\u672c\n\n> quote \u00fc",
+        ]
+        for markdown in markdowns:
+            with self.subTest(markdown):
+                self.assertEqual(list(scan_blocks(markdown)), list(scan_mapped(markdown.encode())))
+                crlf = markdown.replace("\n", "\r\n").encode()
+                self.assertEqual(list(scan_lines(io.StringIO(markdown))), list(scan_mapped(crlf)))
+
+    def test_stream_mapped_to_html(self):
+        markdown = "# Title\n\nSome **bold** text\n\n```\ncode\n\nblock\n```\n\n- a\n- b\n"
+        out = io.StringIO()
+        stream_mapped_to_html(markdown.encode(), out)
+        self.assertEqual(markdown_to_html(markdown), out.getvalue())
+
+    def test_markdown_to_html_matches_node_tree(self):
+        markdowns = [
+            "# Title\n\nSome **bold** and _italic_ with `code`",
+            "![img](/a.png) then [link](https://example.com)\n\n> quote **b**\n> more",
+            "1. one\n2. [two](/two)\n\n- a\n- b _c_\n\n```\ncode **raw**\n```",
+            "###### Deep\n\nplain [unclosed bracket and ! bang",
+        ]
+        for markdown in markdowns:
+            with self.subTest(markdown):
+                self.assertEqual(markdown_to_html_node(markdown).to_html(), markdown_to_html(markdown))
+
+    def test_block_to_html_errors_match_node_tree(self):
+        cases = [
+            ("#", BlockType.HEADING),
+            ("some **bold", BlockType.PARAGRAPH),
+            ("> ok\nnot quote", BlockType.QUOTE),
+            ("not code", BlockType.CODE),
+        ]
+        for block, block_type in cases:
+            with self.subTest(block):
+                with self.assertRaises(ValueError):
+                    block_to_html_node(block, block_type)
+                with self.assertRaises(ValueError):
+                    block_to_html(block, block_type)
+
+    def test_block_to_html(self):
+        self.assertEqual("<h2>Hi <b>you</b></h2>", block_to_html("## Hi **you**"))
+        with self.assertRaises(ValueError):
+            block_to_html("text", "not a block type")
+
+    def test_markdown_document_builds_tree_lazily(self):
+        document = MarkdownDocument("# Title\n\ntext")
+        self.assertEqual("<div><h1>Title</h1><p>text</p></div>", document.to_html())
+        self.assertIsNone(document._node)
+        document.node.children.pop()
+        self.assertEqual("<div><h1>Title</h1></div>", document.to_html())
+
     def test_block_to_block_type_general(self):
         cases = [
             ("# This is a heading", BlockType.HEADING),
@@ -95,6 +239,10 @@ this is the 6th line
         node = block_to_html_node(block)
         self.assertTrue(node.tag, "<p>")
 
+    def test_block_to_html_node_invalid_type(self):
+        with self.assertRaises(ValueError):
+            block_to_html_node("text", "not a block type")
+
     def test_paragraphs(self):
         md = """
 This is **bolded** paragraph
@@ -127,6 +275,11 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_codeblock_with_blank_lines(self):
+        md = "```\nfirst\n\nsecond\n```"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual("<div><pre><code>first\n\nsecond\n</code></pre></div>", html)
+
     def test_lists(self):
         md = """
 - List item 1
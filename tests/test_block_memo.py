@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from src.block_markdown import markdown_to_html_node
+from src.block_memo import BlockMemo
+from src.fingerprint import set_asset_manifest
+from src.images import set_image_manifest
+
+MARKDOWN = """
+# Title
+
+A paragraph with **bold** text
+
+- one
+- two
+"""
+
+
+class TestBlockMemo(unittest.TestCase):
+    def test_render_matches_tree(self):
+        memo = BlockMemo()
+        self.assertEqual(markdown_to_html_node(MARKDOWN).to_html(), memo.render(MARKDOWN))
+
+    def test_only_changed_blocks_miss(self):
+        memo = BlockMemo()
+        memo.render(MARKDOWN)
+        memo.render(MARKDOWN.replace("**bold**", "_italic_"))
+        self.assertEqual({"hits": 2, "misses": 4, "entries": 4}, {k: v for k, v in memo.stats().items() if k != "hit_rate"})
+
+    def test_asset_manifest_changes_key(self):
+        memo = BlockMemo()
+        self.addCleanup(set_asset_manifest, {})
+        self.assertEqual('<div><p><a href="/a.css">css</a></p></div>', memo.render("[css](/a.css)"))
+        set_asset_manifest({"a.css": "a.0123456789ab.css"})
+        self.assertEqual('<div><p><a href="/a.0123456789ab.css">css</a></p></div>', memo.render("[css](/a.css)"))
+        set_asset_manifest({})
+        self.assertEqual('<div><p><a href="/a.css">css</a></p></div>', memo.render("[css](/a.css)"))
+        self.assertEqual((1, 2), (memo.hits, memo.misses))
+
+    def test_image_manifest_changes_key(self):
+        memo = BlockMemo()
+        self.addCleanup(set_image_manifest, {})
+        self.assertEqual('<div><p><img src="/a.png" alt="a"></p></div>', memo.render("![a](/a.png)"))
+        set_image_manifest({"a.png": {"width": 640, "height": 480}})
+        self.assertEqual(
+            '<div><p><img src="/a.png" alt="a" width="640" height="480"></p></div>', memo.render("![a](/a.png)")
+        )
+        self.assertEqual((0, 2), (memo.hits, memo.misses))
+
+    def test_eviction_bound(self):
+        memo = BlockMemo(max_entries=2)
+        memo.render(MARKDOWN)
+        self.assertEqual(2, len(memo.fragments))
+        memo.render("- one\n- two")
+        self.assertEqual(1, memo.hits)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "memo.json")
+            memo = BlockMemo()
+            memo.render(MARKDOWN)
+            memo.save(path)
+            loaded = BlockMemo.load(path)
+            loaded.render(MARKDOWN)
+            self.assertEqual((3, 0), (loaded.hits, loaded.misses))
+            self.assertEqual(0, len(BlockMemo.load(path, version="other").fragments))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import os
+import tempfile
+import unittest
+
+from src.build import STREAM_THRESHOLD, BuildError, build_pages, chunk_sources, find_content_files, output_path_for
+from src.fingerprint import set_asset_manifest
+from src.render_cache import RenderCache
+from src.template import Template
+
+
+class TestBuildPages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write("index.md", "# Home\n\nWelcome to **the** site")
+        for i in range(12):
+            self.write(os.path.join("blog", f"post{i}.md"), f"## Post {i}\n\n- item _{i}_\n- another")
+        self.write("notes.txt", "not markdown")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, content):
+        with open(os.path.join(self.content, rel_path), "w") as f:
+            f.write(content)
+
+    def read_tree(self, root):
+        files = {}
+        for dir_path, _, file_names in os.walk(root):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def test_find_content_files(self):
+        files = find_content_files(self.content)
+        self.assertEqual(13, len(files))
+        self.assertEqual(sorted(files), files)
+        self.assertEqual(os.path.join("blog", "post1.html"), output_path_for(os.path.join("blog", "post1.md")))
+
+    def test_parallel_build_matches_serial(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        build_pages(self.content, serial, jobs=1)
+        stats = build_pages(self.content, parallel, jobs=3, chunk_size=2)
+        self.assertEqual(13, stats["pages"])
+        self.assertEqual(self.read_tree(serial), self.read_tree(parallel))
+        self.assertEqual(b"<div><h1>Home</h1><p>Welcome to <b>the</b> site</p></div>", self.read_tree(serial)["index.html"])
+
+    def test_errors_are_sorted_and_complete(self):
+        self.write(os.path.join("blog", "post9.md"), "broken **bold")
+        self.write("bad.md", "broken _italic")
+        with self.assertRaises(BuildError) as raised:
+            build_pages(self.content, os.path.join(self.tmp.name, "public"), jobs=2, chunk_size=1)
+        self.assertEqual(["bad.md", os.path.join("blog", "post9.md")], [path for path, _ in raised.exception.errors])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "public", "index.html")))
+
+    def test_cache_hits_skip_rendering(self):
+        cache = RenderCache(os.path.join(self.tmp.name, "cache"))
+        first = build_pages(self.content, os.path.join(self.tmp.name, "first"), jobs=1, cache=cache)
+        stats = build_pages(
+            self.content, os.path.join(self.tmp.name, "second"), jobs=1, cache=cache, previous_index=first["index"]
+        )
+        self.assertEqual((0, 13), (stats["rendered"], stats["cached"]))
+        self.assertEqual(first["index"], stats["index"])
+
+    def test_cache_hits_without_index_entry_are_rendered(self):
+        cache = RenderCache(os.path.join(self.tmp.name, "cache"))
+        build_pages(self.content, os.path.join(self.tmp.name, "first"), jobs=1, cache=cache)
+        stats = build_pages(self.content, os.path.join(self.tmp.name, "second"), jobs=1, cache=cache)
+        self.assertEqual((13, 0), (stats["rendered"], stats["cached"]))
+
+    def test_reference_index(self):
+        self.write("index.md", "[post](/blog/post1.html) and ![logo](/logo.png)\n\n```\n[not](/a/link)\n```")
+        serial = build_pages(self.content, os.path.join(self.tmp.name, "serial"), jobs=1)
+        streamed = build_pages(self.content, os.path.join(self.tmp.name, "streamed"), jobs=2, stream_threshold=0)
+        expected = [{"kind": "link", "target": "/blog/post1.html"}, {"kind": "image", "target": "/logo.png"}]
+        self.assertEqual(expected, serial["index"]["index.md"]["references"])
+        self.assertEqual(expected, streamed["index"]["index.md"]["references"])
+        self.assertEqual(13, len(serial["index"]))
+
+    def test_large_pages_are_streamed(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        streamed = os.path.join(self.tmp.name, "streamed")
+        build_pages(self.content, serial, jobs=1)
+        stats = build_pages(self.content, streamed, jobs=2, stream_threshold=0)
+        self.assertEqual(13, stats["streamed"])
+        self.assertEqual(self.read_tree(serial), self.read_tree(streamed))
+
+    def test_streamed_errors_remove_partial_output(self):
+        self.write("bad.md", "# fine\n\nbroken **bold")
+        public = os.path.join(self.tmp.name, "public")
+        with self.assertRaises(BuildError) as raised:
+            build_pages(self.content, public, jobs=1, stream_threshold=0)
+        self.assertEqual(["bad.md"], [path for path, _ in raised.exception.errors])
+        self.assertFalse(os.path.exists(os.path.join(public, "bad.html")))
+
+    def test_template_pages(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        public = os.path.join(self.tmp.name, "public")
+        build_pages(self.content, public, jobs=1, template=template)
+        self.assertEqual(
+            b"<title>Home</title><main><div><h1>Home</h1><p>Welcome to <b>the</b> site</p></div></main>",
+            self.read_tree(public)["index.html"],
+        )
+        streamed = os.path.join(self.tmp.name, "streamed")
+        build_pages(self.content, streamed, jobs=2, template=template, stream_threshold=0)
+        self.assertEqual(self.read_tree(public), self.read_tree(streamed))
+
+    def test_workers_rewrite_asset_urls(self):
+        self.write("index.md", "![logo](/images/logo.png) and [styles](/index.css)")
+        set_asset_manifest({"images/logo.png": "images/logo.0123456789ab.png"})
+        self.addCleanup(set_asset_manifest, {})
+        for jobs in (1, 2):
+            public = os.path.join(self.tmp.name, f"public{jobs}")
+            build_pages(self.content, public, jobs=jobs)
+            self.assertEqual(
+                b'<div><p><img src="/images/logo.0123456789ab.png" alt="logo"> and <a href="/index.css">styles</a></p></div>',
+                self.read_tree(public)["index.html"],
+            )
+
+    def test_deleted_pages_are_removed(self):
+        public = os.path.join(self.tmp.name, "public")
+        first = build_pages(self.content, public, jobs=1)
+        os.remove(os.path.join(self.content, "index.md"))
+        for i in range(12):
+            os.remove(os.path.join(self.content, "blog", f"post{i}.md"))
+        self.write("about.md", "# About")
+        stats = build_pages(self.content, public, jobs=1, previous_index=first["index"])
+        self.assertEqual(13, stats["removed"])
+        self.assertEqual(["about.html"], sorted(self.read_tree(public)))
+
+    def test_unchanged_pages_are_not_rewritten(self):
+        for threshold in (STREAM_THRESHOLD, 0):
+            public = os.path.join(self.tmp.name, f"public{threshold}")
+            build_pages(self.content, public, jobs=1, stream_threshold=threshold)
+            index_path = os.path.join(public, "index.html")
+            before = os.stat(index_path)
+            stats = build_pages(self.content, public, jobs=1, stream_threshold=threshold)
+            self.assertEqual((13, 0), (stats["pages"], stats["bytes"]))
+            after = os.stat(index_path)
+            self.assertEqual((before.st_ino, before.st_mtime_ns), (after.st_ino, after.st_mtime_ns))
+            self.write("index.md", "# Home\n\nWelcome to **our** site")
+            stats = build_pages(self.content, public, jobs=1, stream_threshold=threshold)
+            self.assertNotEqual(before.st_ino, os.stat(index_path).st_ino)
+            self.assertEqual(b"<div><h1>Home</h1><p>Welcome to <b>our</b> site</p></div>", self.read_tree(public)["index.html"])
+            self.write("index.md", "# Home\n\nWelcome to **the** site")
+
+    def test_chunk_sources(self):
+        chunks = chunk_sources(list(range(10)), jobs=2, chunk_size=4)
+        self.assertEqual([[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]], chunks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from src.compress import ENCODERS, compress_file, compress_tree, gzip_compress
+
+
+class TestCompressTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.tmp.name, "public")
+        os.makedirs(os.path.join(self.public, "blog"))
+        self.html = os.path.join(self.public, "blog", "post.html")
+        self.write(self.html, "<p>hello world</p>" * 200)
+        self.write(os.path.join(self.public, "index.css"), "body { margin: 0; }\n" * 100)
+        self.write(os.path.join(self.public, "image.png"), "not text" * 100)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, content):
+        with open(path, "w") as f:
+            f.write(content)
+
+    def test_writes_variants_for_text_assets(self):
+        stats = compress_tree(self.public, workers=2)
+        self.assertEqual(2, stats["files"])
+        self.assertEqual(2 * len(ENCODERS), stats["written"])
+        with gzip.open(self.html + ".gz", "rt") as f:
+            self.assertEqual("<p>hello world</p>" * 200, f.read())
+        self.assertFalse(os.path.exists(os.path.join(self.public, "image.png.gz")))
+
+    def test_skips_up_to_date_variants(self):
+        compress_tree(self.public)
+        stats = compress_tree(self.public)
+        self.assertEqual(0, stats["written"])
+        self.assertEqual(2 * len(ENCODERS), stats["up_to_date"])
+
+        self.write(self.html, "<p>changed</p>" * 200)
+        newest = max(os.stat(self.html + suffix).st_mtime_ns for suffix, _ in ENCODERS)
+        os.utime(self.html, ns=(newest + 1, newest + 1))
+        stats = compress_tree(self.public)
+        self.assertEqual(len(ENCODERS), stats["written"])
+        with gzip.open(self.html + ".gz", "rt") as f:
+            self.assertEqual("<p>changed</p>" * 200, f.read())
+
+    def test_skips_small_savings(self):
+        tiny = os.path.join(self.public, "tiny.js")
+        self.write(tiny, "x")
+        result, entry = compress_file(tiny, [(".gz", gzip_compress)])
+        self.assertEqual(1, result["skipped"])
+        self.assertEqual([".gz"], entry["skipped"])
+        self.assertFalse(os.path.exists(tiny + ".gz"))
+
+    def test_remembers_small_savings(self):
+        tiny = os.path.join(self.public, "tiny.js")
+        self.write(tiny, "x")
+        compressed = []
+
+        def counting_gzip(data):
+            compressed.append(len(data))
+            return gzip_compress(data)
+
+        encoders = [(".gz", counting_gzip)]
+        manifest_path = os.path.join(self.tmp.name, "compress_manifest.json")
+        first = compress_tree(self.public, workers=1, encoders=encoders, manifest_path=manifest_path)
+        second = compress_tree(self.public, workers=1, encoders=encoders, manifest_path=manifest_path)
+        self.assertEqual(3, len(compressed))
+        self.assertEqual((1, 1), (first["skipped"], second["skipped"]))
+        self.assertEqual((0, 2), (second["written"], second["up_to_date"]))
+
+        self.write(tiny, "x" * 1000)
+        stats = compress_tree(self.public, workers=1, encoders=encoders, manifest_path=manifest_path)
+        self.assertEqual((1, 0), (stats["written"], stats["skipped"]))
+        self.assertTrue(os.path.exists(tiny + ".gz"))
+
+    def test_removes_stale_variants(self):
+        compress_tree(self.public)
+        os.remove(self.html)
+        stats = compress_tree(self.public)
+        self.assertEqual(len(ENCODERS), stats["removed"])
+        self.assertFalse(os.path.exists(self.html + ".gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from src.fingerprint import asset_manifest_digest, asset_url, fingerprinted_path, set_asset_manifest
+from src.text_node import TextNode, TextType, text_node_to_html_node
+
+
+class TestAssetUrl(unittest.TestCase):
+    def setUp(self):
+        set_asset_manifest({"index.css": "index.0123456789ab.css", "images/cat.png": "images/cat.ba9876543210.png"})
+
+    def tearDown(self):
+        set_asset_manifest({})
+
+    def test_fingerprinted_path(self):
+        self.assertEqual("images/cat.0123456789ab.png", fingerprinted_path("images/cat.png", "0123456789abcdef"))
+
+    def test_rewrites_local_assets(self):
+        self.assertEqual("/index.0123456789ab.css", asset_url("/index.css"))
+        self.assertEqual("/images/cat.ba9876543210.png?v=1#top", asset_url("/images/cat.png?v=1#top"))
+
+    def test_leaves_other_urls(self):
+        for url in ("https://example.com/index.css", "//cdn.example.com/index.css", "index.css", "/missing.css"):
+            self.assertEqual(url, asset_url(url))
+
+    def test_text_nodes_use_fingerprinted_urls(self):
+        image = text_node_to_html_node(TextNode("cat", TextType.IMAGE, "/images/cat.png"))
+        link = text_node_to_html_node(TextNode("css", TextType.LINK, "/index.css"))
+        self.assertEqual("/images/cat.ba9876543210.png", image.props["src"])
+        self.assertEqual("/index.0123456789ab.css", link.props["href"])
+
+    def test_manifest_digest_changes_with_assets(self):
+        self.assertNotEqual(asset_manifest_digest({"a.css": "a.1.css"}), asset_manifest_digest({"a.css": "a.2.css"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
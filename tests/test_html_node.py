@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from src.html_node import HTMLNode, LeafNode, ParentNode
@@ -15,6 +16,11 @@ class TestHTMLNode(unittest.TestCase):
             "HTMLNode(div, None, None, {'href': 'https://www.google.com', 'target': '_blank'})", repr(node)
         )
 
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode("p"), LeafNode("b", "bold"), ParentNode("div", [])):
+            with self.subTest(node):
+                self.assertFalse(hasattr(node, "__dict__"))
+
     def test_values(self):
         node = HTMLNode("p", "Hello there")
         self.assertEqual(node.tag, "p")
@@ -41,6 +47,15 @@ class TestLeafNode(unittest.TestCase):
         self.assertEqual(node.to_html(), '<a href="https://www.google.com">Hello, world!</a>')
 
 
+    def test_void_element_without_value(self):
+        node = LeafNode("img", None, {"src": "/cat.png", "alt": "a cat"})
+        self.assertEqual('<img src="/cat.png" alt="a cat">', node.to_html())
+
+    def test_leaf_without_value_raises(self):
+        with self.assertRaises(ValueError):
+            LeafNode("p", None).to_html()
+
+
 class TestParentNode(unittest.TestCase):
     def test_to_html_with_children(self):
         child_node = LeafNode("span", "child")
@@ -86,6 +101,32 @@ class TestParentNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             ParentNode("div", None).to_html()
 
+    def test_write_html(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text")])], {"id": "x"})
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual('<div id="x"><p><b>bold</b> text</p></div>', buffer.getvalue())
+
+    def test_iter_html_deep_tree(self):
+        node = LeafNode(None, "leaf")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = "".join(node.iter_html())
+        self.assertEqual("<span>" * 5000 + "leaf" + "</span>" * 5000, html)
+        self.assertEqual(html, node.to_html())
+
+    def test_iter_html_fragments_and_error(self):
+        node = ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text")], {"class": "x"})
+        self.assertEqual(['<p class="x">', "<b>bold</b>", " text", "</p>"], list(node.iter_html()))
+        fragments = ParentNode("div", [LeafNode("i", "ok"), LeafNode("b", None)]).iter_html()
+        self.assertEqual(["<div>", "<i>ok</i>"], [next(fragments), next(fragments)])
+        with self.assertRaises(ValueError):
+            next(fragments)
+
+    def test_base_node_cannot_render(self):
+        with self.assertRaises(NotImplementedError):
+            HTMLNode("p", "text").to_html()
+
 
 if __name__ == "__main__":
     unittest.main()
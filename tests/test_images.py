@@ -0,0 +1,141 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from src.images import Image, image_info, image_size, optimize_images, set_image_manifest
+from src.text_node import TextNode, TextType, text_node_to_html_node
+
+
+def png_header(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", width, height) + bytes(9)
+
+
+def jpeg_header(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + bytes(14)
+    sof0 = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + bytes(12)
+    return b"\xff\xd8" + app0 + sof0
+
+
+def gif_header(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + bytes(4)
+
+
+def webp_header(width, height):
+    body = b"VP8X" + struct.pack("<I", 10) + bytes(4) + (width - 1).to_bytes(3, "little")
+    body += (height - 1).to_bytes(3, "little")
+    return b"RIFF" + struct.pack("<I", len(body) + 4) + b"WEBP" + body
+
+
+class TestImageSize(unittest.TestCase):
+    def test_headers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, header in (
+                ("a.png", png_header(640, 480)),
+                ("a.jpg", jpeg_header(640, 480)),
+                ("a.gif", gif_header(640, 480)),
+                ("a.webp", webp_header(640, 480)),
+            ):
+                path = os.path.join(tmp, name)
+                with open(path, "wb") as f:
+                    f.write(header)
+                self.assertEqual((640, 480), tuple(image_size(path)), name)
+
+    def test_unknown_format(self):
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(b"not an image")
+            f.flush()
+            self.assertIsNone(image_size(f.name))
+
+
+class TestOptimizeImages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.manifest = os.path.join(self.tmp.name, ".cache", "images.json")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.image = os.path.join(self.static, "images", "photo.png")
+        if Image is None:
+            with open(self.image, "wb") as f:
+                f.write(png_header(2000, 1000))
+        else:
+            Image.new("RGB", (2000, 1000), (200, 100, 50)).save(self.image)
+        with open(os.path.join(self.static, "index.css"), "w") as f:
+            f.write("body {}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unchanged_images_are_not_reprocessed(self):
+        stats = optimize_images(self.static, self.public, self.manifest, widths=(480, 960), jobs=1)
+        self.assertEqual(1, stats["images"])
+        self.assertEqual(1, stats["processed"])
+        info = stats["manifest"]["images/photo.png"]
+        self.assertEqual((2000, 1000), (info["width"], info["height"]))
+
+        stats = optimize_images(self.static, self.public, self.manifest, widths=(480, 960), jobs=1)
+        self.assertEqual(0, stats["processed"])
+        self.assertEqual(1, stats["unchanged"])
+        self.assertEqual(info, stats["manifest"]["images/photo.png"])
+
+    def test_settings_change_reprocesses(self):
+        optimize_images(self.static, self.public, self.manifest, widths=(480,), jobs=1)
+        stats = optimize_images(self.static, self.public, self.manifest, widths=(640,), jobs=1)
+        self.assertEqual(1, stats["processed"])
+
+    def test_unreadable_images_are_published_without_variants(self):
+        with open(os.path.join(self.static, "images", "bad.png"), "wb") as f:
+            f.write(b"not an image at all")
+        with open(os.path.join(self.static, "images", "truncated.png"), "wb") as f:
+            f.write(png_header(300, 200))
+        stats = optimize_images(self.static, self.public, self.manifest, widths=(100,), jobs=1)
+        self.assertEqual(3, stats["images"])
+        self.assertEqual({}, stats["manifest"]["images/bad.png"])
+        self.assertEqual({"width": 300, "height": 200}, stats["manifest"]["images/truncated.png"])
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_resized_variants(self):
+        stats = optimize_images(self.static, self.public, self.manifest, widths=(480, 960), jobs=1)
+        srcset = stats["manifest"]["images/photo.png"]["srcset"]
+        self.assertEqual(3, len(srcset.split(", ")))
+        first = srcset.split(" ")[0]
+        with Image.open(os.path.join(self.public, first.lstrip("/"))) as variant:
+            self.assertEqual((480, 240), variant.size)
+
+        os.remove(self.image)
+        stats = optimize_images(self.static, self.public, self.manifest, widths=(480, 960), jobs=1)
+        self.assertGreaterEqual(stats["removed"], 3)
+        self.assertFalse(os.path.exists(os.path.join(self.public, first.lstrip("/"))))
+
+
+class TestImageAttributes(unittest.TestCase):
+    def tearDown(self):
+        set_image_manifest({})
+
+    def test_image_info(self):
+        entry = {
+            "width": 1000,
+            "height": 500,
+            "format": "png",
+            "variants": [
+                {"path": "images/a.k-480w.png", "width": 480, "format": "png"},
+                {"path": "images/a.k-480w.webp", "width": 480, "format": "webp"},
+                {"path": "images/a.k-1000w.png", "width": 1000, "format": "png"},
+            ],
+        }
+        self.assertEqual(
+            {"width": 1000, "height": 500, "srcset": "/images/a.k-480w.png 480w, /images/a.k-1000w.png 1000w"},
+            image_info(entry),
+        )
+
+    def test_image_node_gets_dimensions(self):
+        set_image_manifest({"images/a.png": {"width": 640, "height": 480}})
+        node = text_node_to_html_node(TextNode("a", TextType.IMAGE, "/images/a.png"))
+        self.assertEqual('<img src="/images/a.png" alt="a" width="640" height="480">', node.to_html())
+        other = text_node_to_html_node(TextNode("b", TextType.IMAGE, "/images/b.png"))
+        self.assertEqual({"src": "/images/b.png", "alt": "b"}, other.props)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,12 +2,14 @@ import unittest
 
 from src.inline_markdown import (
     extract_markdown_images,
+    inline_tokens,
     extract_markdown_links,
     split_nodes_delimiter,
     split_nodes_media,
+    text_to_html,
     text_to_textnodes,
 )
-from src.text_node import TextNode, TextType
+from src.text_node import TextNode, TextType, text_node_to_html_node
 
 
 class TestSplitDelimiter(unittest.TestCase):
@@ -195,6 +197,70 @@ class TestExtractMarkdown(unittest.TestCase):
             new_nodes,
         )
 
+    def test_text_to_textnodes_underscore_in_url(self):
+        text = "see [the docs](https://example.com/some_page_name) now"
+        self.assertListEqual(
+            [
+                TextNode("see ", TextType.TEXT),
+                TextNode("the docs", TextType.LINK, "https://example.com/some_page_name"),
+                TextNode(" now", TextType.TEXT),
+            ],
+            text_to_textnodes(text),
+        )
+
+    def test_text_to_textnodes_code_is_literal(self):
+        text = "run `a **b** c` here"
+        self.assertListEqual(
+            [
+                TextNode("run ", TextType.TEXT),
+                TextNode("a **b** c", TextType.CODE),
+                TextNode(" here", TextType.TEXT),
+            ],
+            text_to_textnodes(text),
+        )
+
+    def test_text_to_textnodes_stray_bracket(self):
+        text = "a [stray bracket and a [link](https://boot.dev)"
+        self.assertListEqual(
+            [
+                TextNode("a [stray bracket and a ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://boot.dev"),
+            ],
+            text_to_textnodes(text),
+        )
+
+    def test_broken_link_does_not_swallow_image(self):
+        text = "x [ ]( y ![i](p) z"
+        self.assertListEqual(
+            [
+                TextNode("x [ ]( y ", TextType.TEXT),
+                TextNode("i", TextType.IMAGE, "p"),
+                TextNode(" z", TextType.TEXT),
+            ],
+            text_to_textnodes(text),
+        )
+        out = []
+        text_to_html(text, out)
+        self.assertEqual('x [ ]( y <img src="p" alt="i"> z', "".join(out))
+
+    def test_renderers_share_inline_tokens(self):
+        text = "**b** [l](/u) _i_ ![a](/p.png) `c` tail"
+        tokens = list(inline_tokens(text))
+        self.assertEqual(
+            [(TextType.BOLD, "b", None), (TextType.TEXT, " ", None), (TextType.LINK, "l", "/u")],
+            tokens[:3],
+        )
+        self.assertEqual([TextNode(value, text_type, url) for text_type, value, url in tokens], text_to_textnodes(text))
+        out = []
+        text_to_html(text, out)
+        self.assertEqual(
+            "".join(text_node_to_html_node(node).to_html() for node in text_to_textnodes(text)), "".join(out)
+        )
+
+    def test_text_to_textnodes_unclosed(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("this is **not closed")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src import block_markdown
+from src.block_markdown import markdown_to_html_node
+from src.build import render_page
+from src.instrument import NULL_STAGE, PROFILER, Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_profiler_records_nothing(self):
+        profiler = Profiler()
+        self.assertIs(NULL_STAGE, profiler.stage("copy"))
+        items = [1, 2, 3]
+        self.assertIs(items, profiler.timed_iter("scan", items))
+        profiler.count("bytes", 10)
+        profiler.record_page("a.md", 1.0)
+        self.assertEqual({"stages": {}, "counters": {}, "slowest_pages": []}, profiler.report())
+
+    def test_stage_and_counters(self):
+        profiler = Profiler(enabled=True)
+        with profiler.stage("copy"):
+            pass
+        with profiler.stage("copy"):
+            pass
+        profiler.count("bytes", 10)
+        self.assertEqual(list(profiler.timed_iter("scan", [1, 2])), [1, 2])
+        report = profiler.report()
+        self.assertEqual(2, report["stages"]["copy"]["calls"])
+        self.assertEqual(2, report["stages"]["scan"]["calls"])
+        self.assertEqual({"bytes": 10}, report["counters"])
+
+    def test_slowest_pages(self):
+        profiler = Profiler(enabled=True, slowest=2)
+        for i, seconds in enumerate([0.3, 0.1, 0.5, 0.2]):
+            profiler.record_page(f"{i}.md", seconds)
+        self.assertEqual(["2.md", "0.md"], [page["path"] for page in profiler.report()["slowest_pages"]])
+
+    def test_merge_snapshot(self):
+        worker = Profiler(enabled=True)
+        worker.add_time("pages", 0.5)
+        worker.count("pages", 2)
+        worker.record_page("a.md", 0.5)
+        parent = Profiler(enabled=True)
+        parent.add_time("pages", 0.25)
+        parent.merge(json.loads(json.dumps(worker.snapshot())))
+        report = parent.report()
+        self.assertEqual({"seconds": 0.75, "calls": 2}, report["stages"]["pages"])
+        self.assertEqual([{"path": "a.md", "seconds": 0.5}], report["slowest_pages"])
+
+    def test_hooks_patch_and_restore(self):
+        original = block_markdown.classify_block
+        PROFILER.reset()
+        PROFILER.enable()
+        try:
+            self.assertIsNot(original, block_markdown.classify_block)
+            markdown_to_html_node("# Title\n\nSome _text_")
+            render_page("# Title\n\nSome _text_")
+            report = PROFILER.report()
+        finally:
+            PROFILER.disable()
+            PROFILER.reset()
+        self.assertIs(original, block_markdown.classify_block)
+        self.assertEqual(4, report["stages"]["block_classify"]["calls"])
+        self.assertEqual(4, report["stages"]["inline_tokenize"]["calls"])
+        self.assertEqual(1, report["stages"]["serialize"]["calls"])
+        self.assertIn("block_scan", report["stages"])
+
+    def test_write_report(self):
+        profiler = Profiler(enabled=True)
+        profiler.count("bytes_written", 5)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "reports", "profile.json")
+            profiler.write_report(path)
+            with open(path) as f:
+                self.assertEqual({"bytes_written": 5}, json.load(f)["counters"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from src.build import write_page
+from src.publish import StagedPublish, remove_public, seed_tree
+
+
+class TestStagedPublish(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.tmp.name, "public")
+        self.state = os.path.join(self.tmp.name, ".cache", "manifest.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def publish(self, files, seed=True):
+        with StagedPublish(self.public, seed=seed, state_paths=[self.state]) as staging:
+            for rel_path, content in files.items():
+                write_page(os.path.join(staging, rel_path), content)
+            self.write(self.state, "after")
+        return staging
+
+    def test_seed_tree_hardlinks(self):
+        source = os.path.join(self.tmp.name, "source")
+        self.write(os.path.join(source, "a", "b.txt"), "b")
+        dest = os.path.join(self.tmp.name, "dest")
+        self.assertEqual({"linked": 1, "copied": 0}, seed_tree(source, dest))
+        self.assertTrue(os.path.samefile(os.path.join(source, "a", "b.txt"), os.path.join(dest, "a", "b.txt")))
+
+    def test_commit_flips_symlink_and_reuses_previous(self):
+        first = self.publish({"index.html": "one", "keep.html": "kept"})
+        self.assertTrue(os.path.islink(self.public))
+        self.assertEqual("one", self.read(os.path.join(self.public, "index.html")))
+
+        second = self.publish({"index.html": "two"})
+        self.assertEqual("two", self.read(os.path.join(self.public, "index.html")))
+        self.assertEqual("kept", self.read(os.path.join(self.public, "keep.html")))
+        self.assertTrue(os.path.samefile(os.path.join(first, "keep.html"), os.path.join(second, "keep.html")))
+        self.assertEqual("one", self.read(os.path.join(first, "index.html")))
+
+        third = self.publish({"index.html": "three"})
+        self.assertFalse(os.path.exists(first))
+        self.assertEqual([second, third], StagedPublish(self.public).generations())
+
+    def test_failed_build_leaves_public_and_state(self):
+        self.publish({"index.html": "one"})
+        with self.assertRaises(RuntimeError):
+            with StagedPublish(self.public, state_paths=[self.state]) as staging:
+                write_page(os.path.join(staging, "index.html"), "broken")
+                self.write(self.state, "half written")
+                raise RuntimeError("build failed")
+        self.assertEqual("one", self.read(os.path.join(self.public, "index.html")))
+        self.assertEqual("after", self.read(self.state))
+        self.assertEqual(1, len(StagedPublish(self.public).generations()))
+
+    def test_remove_public_after_staged_builds(self):
+        self.publish({"index.html": "one"})
+        self.publish({"index.html": "two"})
+        remove_public(self.public)
+        self.assertFalse(os.path.lexists(self.public))
+        self.assertEqual([], StagedPublish(self.public).generations())
+        write_page(os.path.join(self.public, "index.html"), "plain")
+        remove_public(self.public)
+        self.assertFalse(os.path.exists(self.public))
+
+    def test_replaces_existing_directory(self):
+        self.write(os.path.join(self.public, "old.html"), "old")
+        self.publish({"index.html": "new"}, seed=False)
+        self.assertTrue(os.path.islink(self.public))
+        self.assertEqual(["index.html"], os.listdir(self.public))
+        self.assertEqual(2, len(StagedPublish(self.public).generations()))
+
+
+if __name__ == "__main__":
+    unittest.main()
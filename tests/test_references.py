@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from src.references import (
+    check_references,
+    collecting,
+    index_entry,
+    load_reference_index,
+    resolve_target,
+    save_reference_index,
+)
+from src.block_markdown import markdown_to_html
+from src.build import build_pages
+
+
+class TestReferences(unittest.TestCase):
+    def test_collecting(self):
+        with collecting() as references:
+            markdown_to_html("[a](/a.html)\n\n- ![b](b.png)")
+        self.assertEqual([("link", "/a.html"), ("image", "b.png")], references)
+        markdown_to_html("[c](/c.html)")
+        self.assertEqual(2, len(references))
+
+    def test_resolve_target(self):
+        self.assertEqual("images/a.png", resolve_target("blog/post.md", "/images/a.png?v=1"))
+        self.assertEqual("blog/other.html", resolve_target("blog/post.md", "other.html#top"))
+        self.assertEqual("index.html", resolve_target("blog/post.md", "../index.html"))
+        self.assertEqual("", resolve_target("index.md", "/"))
+
+    def test_check_references(self):
+        with tempfile.TemporaryDirectory() as public:
+            for rel_path in ("index.html", os.path.join("blog", "index.html"), os.path.join("blog", "post.html")):
+                os.makedirs(os.path.join(public, os.path.dirname(rel_path)), exist_ok=True)
+                open(os.path.join(public, rel_path), "w").close()
+            pages = {
+                "index.md": index_entry(
+                    "d1",
+                    [
+                        ("link", "/blog/"),
+                        ("link", "/blog/post"),
+                        ("link", "https://example.com/missing"),
+                        ("image", "/images/missing.png"),
+                        ("link", "#section"),
+                    ],
+                ),
+                os.path.join("blog", "post.md"): index_entry("d2", [("link", "../index.html"), ("link", "gone.html")]),
+            }
+            self.assertEqual(
+                [
+                    (os.path.join("blog", "post.md"), "gone.html", "link"),
+                    ("index.md", "/images/missing.png", "image"),
+                ],
+                check_references(pages, public),
+            )
+
+    def test_links_to_deleted_pages_are_dead(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            public = os.path.join(tmp, "public")
+            os.makedirs(content)
+            for rel_path, markdown in (("index.md", "[old](/old.html)"), ("old.md", "# Old")):
+                with open(os.path.join(content, rel_path), "w") as f:
+                    f.write(markdown)
+            first = build_pages(content, public, jobs=1)
+            self.assertEqual([], check_references(first["index"], public))
+            os.remove(os.path.join(content, "old.md"))
+            second = build_pages(content, public, jobs=1, previous_index=first["index"])
+            self.assertEqual([("index.md", "/old.html", "link")], check_references(second["index"], public))
+
+    def test_index_round_trip(self):
+        pages = {"index.md": index_entry("abc", [("link", "/a.html")])}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, ".cache", "references.json")
+            self.assertEqual({}, load_reference_index(path))
+            save_reference_index(path, pages)
+            self.assertEqual(pages, load_reference_index(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+
+from src.block_markdown import markdown_to_html_node
+from src.fingerprint import set_asset_manifest
+from src.images import set_image_manifest
+from src.render_cache import RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "render")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render_miss_then_hit(self):
+        cache = RenderCache(self.cache_dir)
+        markdown = "# Title\n\nSome **bold** text"
+        expected = markdown_to_html_node(markdown).to_html()
+        self.assertEqual(expected, cache.render(markdown))
+        self.assertEqual(expected, RenderCache(self.cache_dir).get(markdown))
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+
+    def test_version_changes_key(self):
+        old = RenderCache(self.cache_dir, version="1")
+        new = RenderCache(self.cache_dir, version="2")
+        old.put("text", "<div><p>text</p></div>")
+        self.assertIsNone(new.get("text"))
+
+    def test_asset_manifest_changes_key(self):
+        cache = RenderCache(self.cache_dir)
+        self.addCleanup(set_asset_manifest, {})
+        cache.render("[css](/a.css)")
+        set_asset_manifest({"a.css": "a.0123456789ab.css"})
+        self.assertEqual('<div><p><a href="/a.0123456789ab.css">css</a></p></div>', cache.render("[css](/a.css)"))
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+    def test_image_manifest_changes_key(self):
+        cache = RenderCache(self.cache_dir)
+        self.addCleanup(set_image_manifest, {})
+        cache.render("![a](/a.png)")
+        set_image_manifest({"a.png": {"width": 640, "height": 480}})
+        self.assertEqual(
+            '<div><p><img src="/a.png" alt="a" width="640" height="480"></p></div>', cache.render("![a](/a.png)")
+        )
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+    def test_evicts_least_recently_used(self):
+        writer = RenderCache(self.cache_dir, max_bytes=250)
+        for i in range(2):
+            writer.put(f"doc {i}", "x" * 100)
+            path = writer.entry_path(writer.key(f"doc {i}"))
+            os.utime(path, ns=((i + 1) * 10**9, (i + 1) * 10**9))
+        cache = RenderCache(self.cache_dir, max_bytes=250)
+        cache.put("doc 2", "x" * 100)
+        self.assertIsNone(cache.get("doc 0"))
+        self.assertIsNotNone(cache.get("doc 1"))
+        self.assertIsNotNone(cache.get("doc 2"))
+        self.assertLessEqual(cache.total_bytes(), 250)
+
+    def test_running_total_matches_disk(self):
+        cache = RenderCache(self.cache_dir, max_bytes=1000)
+        for i in range(30):
+            cache.put(f"doc {i % 12}", "x" * (40 + i))
+            self.assertEqual(RenderCache(self.cache_dir).total_bytes(), cache.total_bytes())
+        self.assertLessEqual(cache.total_bytes(), 1000)
+        cache.clear()
+        self.assertEqual(0, cache.total_bytes())
+        cache.put("a", "abc")
+        self.assertEqual(3, cache.total_bytes())
+
+    def test_info_and_clear(self):
+        cache = RenderCache(self.cache_dir)
+        cache.put("a", "<div></div>")
+        self.assertEqual(1, RenderCache(self.cache_dir).info()["entries"])
+        cache.clear()
+        self.assertEqual(0, RenderCache(self.cache_dir).info()["entries"])
+
+
+if __name__ == "__main__":
+    unittest.main()
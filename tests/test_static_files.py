@@ -0,0 +1,221 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from src.fingerprint import load_asset_manifest
+from src.static_files import (
+    MMAP_THRESHOLD,
+    copy_file,
+    copy_tree,
+    file_digest,
+    load_manifest,
+    mapped_file,
+    publish_file,
+    remove_stale,
+    scan_tree,
+    sync_source_files,
+)
+
+
+class TestSyncSourceFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "public")
+        self.manifest = os.path.join(self.tmp.name, ".cache", "manifest.json")
+        os.makedirs(os.path.join(self.source, "images"))
+        self.write(os.path.join(self.source, "index.css"), "body {}")
+        self.write(os.path.join(self.source, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, content):
+        with open(path, "w") as f:
+            f.write(content)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_first_sync_copies_everything(self):
+        stats = sync_source_files(self.source, self.dest, self.manifest)
+        self.assertEqual(2, stats["copied"])
+        self.assertEqual(10, stats["bytes"])
+        self.assertEqual("png", self.read(os.path.join(self.dest, "images", "a.png")))
+        self.assertIn(os.path.join("images", "a.png"), load_manifest(self.manifest))
+
+    def test_second_sync_copies_nothing(self):
+        sync_source_files(self.source, self.dest, self.manifest)
+        stats = sync_source_files(self.source, self.dest, self.manifest)
+        self.assertEqual(0, stats["copied"])
+        self.assertEqual(2, stats["unchanged"])
+
+    def test_changed_file_is_copied(self):
+        sync_source_files(self.source, self.dest, self.manifest)
+        self.write(os.path.join(self.source, "index.css"), "body { color: red; }")
+        stats = sync_source_files(self.source, self.dest, self.manifest)
+        self.assertEqual(1, stats["copied"])
+        self.assertEqual("body { color: red; }", self.read(os.path.join(self.dest, "index.css")))
+
+    def test_missing_dest_file_is_restored(self):
+        sync_source_files(self.source, self.dest, self.manifest)
+        os.remove(os.path.join(self.dest, "index.css"))
+        stats = sync_source_files(self.source, self.dest, self.manifest)
+        self.assertEqual(1, stats["copied"])
+
+    def test_removed_source_file_is_deleted(self):
+        sync_source_files(self.source, self.dest, self.manifest)
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        stats = sync_source_files(self.source, self.dest, self.manifest)
+        self.assertEqual(1, stats["deleted"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_removed_source_file_unlinks_symlink(self):
+        sync_source_files(self.source, self.dest, self.manifest, strategy="symlink")
+        link_path = os.path.join(self.dest, "images", "a.png")
+        self.assertTrue(os.path.islink(link_path))
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        stats = sync_source_files(self.source, self.dest, self.manifest, strategy="symlink")
+        self.assertEqual(1, stats["deleted"])
+        self.assertFalse(os.path.lexists(link_path))
+        self.assertFalse(os.path.lexists(os.path.join(self.dest, "images")))
+
+    def test_deferred_removal(self):
+        sync_source_files(self.source, self.dest, self.manifest)
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        stats = sync_source_files(self.source, self.dest, self.manifest, prune=False)
+        stale_path = os.path.join(self.dest, "images", "a.png")
+        self.assertEqual([stale_path], stats["stale"])
+        self.assertTrue(os.path.exists(stale_path))
+        remove_stale(stats["stale"], self.dest)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_untracked_dest_files_are_kept(self):
+        sync_source_files(self.source, self.dest, self.manifest)
+        self.write(os.path.join(self.dest, "index.html"), "<div></div>")
+        sync_source_files(self.source, self.dest, self.manifest)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_hash_skips_touched_file(self):
+        sync_source_files(self.source, self.dest, self.manifest, use_hash=True)
+        css_path = os.path.join(self.source, "index.css")
+        stat = os.stat(css_path)
+        os.utime(css_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        stats = sync_source_files(self.source, self.dest, self.manifest, use_hash=True)
+        self.assertEqual(0, stats["copied"])
+
+    def test_fingerprint_publishes_hashed_copies(self):
+        stats = sync_source_files(self.source, self.dest, self.manifest, fingerprint=True)
+        digest = hashlib.sha256(b"body {}").hexdigest()[:12]
+        self.assertEqual(f"index.{digest}.css", stats["assets"]["index.css"])
+        self.assertEqual("body {}", self.read(os.path.join(self.dest, stats["assets"]["index.css"])))
+        self.assertEqual("body {}", self.read(os.path.join(self.dest, "index.css")))
+        self.assertEqual(stats["assets"], load_asset_manifest(os.path.join(self.dest, "asset-manifest.json")))
+
+        stats = sync_source_files(self.source, self.dest, self.manifest, fingerprint=True)
+        self.assertEqual(0, stats["copied"])
+        self.assertEqual(f"index.{digest}.css", stats["assets"]["index.css"])
+
+    def test_fingerprint_removes_outdated_copies(self):
+        old = sync_source_files(self.source, self.dest, self.manifest, fingerprint=True)["assets"]
+        self.write(os.path.join(self.source, "index.css"), "body { margin: 0 }")
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        new = sync_source_files(self.source, self.dest, self.manifest, fingerprint=True)["assets"]
+        self.assertNotEqual(old["index.css"], new["index.css"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, old["index.css"])))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, old["images/a.png"])))
+        self.assertEqual({"index.css"}, new.keys())
+
+        sync_source_files(self.source, self.dest, self.manifest)
+        self.assertEqual(["index.css"], os.listdir(self.dest))
+
+
+class TestCopyEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "public")
+        os.makedirs(os.path.join(self.source, "a", "b"))
+        for i, rel_path in enumerate(["top.txt", os.path.join("a", "mid.txt"), os.path.join("a", "b", "deep.txt")]):
+            with open(os.path.join(self.source, rel_path), "wb") as f:
+                f.write(bytes([i]) * (1000 * (i + 1)))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan_tree(self):
+        rel_paths = sorted(rel_path for rel_path, _ in scan_tree(self.source))
+        self.assertEqual([os.path.join("a", "b", "deep.txt"), os.path.join("a", "mid.txt"), "top.txt"], rel_paths)
+
+    def test_file_digest_small_and_mapped(self):
+        small = os.path.join(self.source, "top.txt")
+        large = os.path.join(self.tmp.name, "large.bin")
+        data = bytes(range(256)) * (MMAP_THRESHOLD // 256 + 1)
+        with open(large, "wb") as f:
+            f.write(data)
+        with open(small, "rb") as f:
+            self.assertEqual(hashlib.sha256(f.read()).hexdigest(), file_digest(small))
+        self.assertEqual(hashlib.sha256(data).hexdigest(), file_digest(large))
+
+    def test_mapped_file(self):
+        empty = os.path.join(self.tmp.name, "empty.txt")
+        open(empty, "w").close()
+        with mapped_file(empty) as mapped:
+            self.assertEqual(b"", mapped)
+        with mapped_file(os.path.join(self.source, "top.txt")) as mapped:
+            self.assertEqual(1000, len(mapped))
+            self.assertEqual(-1, mapped.find(b"\n"))
+
+    def test_copy_file_preserves_content(self):
+        source_path = os.path.join(self.source, "a", "b", "deep.txt")
+        dest_path = os.path.join(self.tmp.name, "copy.txt")
+        self.assertEqual(3000, copy_file(source_path, dest_path))
+        with open(source_path, "rb") as a, open(dest_path, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_copy_tree_parallel(self):
+        stats = copy_tree(self.source, self.dest, workers=4)
+        self.assertEqual(3, stats["copied"])
+        self.assertEqual(6000, stats["bytes"])
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "a", "b", "deep.txt")))
+
+    def test_copy_tree_serial(self):
+        stats = copy_tree(self.source, self.dest, workers=1)
+        self.assertEqual(3, stats["copied"])
+
+    def test_hardlink_tree(self):
+        stats = copy_tree(self.source, self.dest, strategy="hardlink")
+        self.assertEqual(0, stats["bytes"])
+        source_stat = os.stat(os.path.join(self.source, "top.txt"))
+        dest_stat = os.stat(os.path.join(self.dest, "top.txt"))
+        self.assertEqual(source_stat.st_ino, dest_stat.st_ino)
+
+    def test_symlink_tree(self):
+        copy_tree(self.source, self.dest, strategy="symlink")
+        self.assertTrue(os.path.islink(os.path.join(self.dest, "a", "mid.txt")))
+
+    def test_reflink_falls_back_or_clones(self):
+        source_path = os.path.join(self.source, "top.txt")
+        dest_path = os.path.join(self.tmp.name, "clone.txt")
+        copied, fell_back = publish_file(source_path, dest_path, "reflink")
+        self.assertEqual(1000 if fell_back else 0, copied)
+        with open(dest_path, "rb") as f:
+            self.assertEqual(bytes([0]) * 1000, f.read())
+
+    def test_copy_replaces_hardlink_without_touching_source(self):
+        source_path = os.path.join(self.source, "top.txt")
+        dest_path = os.path.join(self.tmp.name, "top.txt")
+        publish_file(source_path, dest_path, "hardlink")
+        publish_file(source_path, dest_path, "copy")
+        self.assertNotEqual(os.stat(source_path).st_ino, os.stat(dest_path).st_ino)
+        self.assertEqual(1000, os.path.getsize(source_path))
+
+    def test_unknown_strategy_raises(self):
+        with self.assertRaises(ValueError):
+            copy_tree(self.source, self.dest, strategy="teleport")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import io
+import os
+import tempfile
+import unittest
+
+from src.template import Template, TemplateCache, extract_title, extract_title_from_lines
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_segments(self):
+        template = Template("<title>{{ Title }}</title><body>{{Content}}</body>")
+        self.assertEqual(["<title>", "Title", "</title><body>", "Content", "</body>"], template.parts)
+        self.assertEqual([(1, "Title"), (3, "Content")], template.placeholders)
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}{{ Nav }}")
+        html = template.render({"Title": "Home", "Content": "<p>{{ Title }}</p>"})
+        self.assertEqual("<title>Home</title><p>{{ Title }}</p>", html)
+
+    def test_write_with_stream(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}!")
+        out = io.StringIO()
+        template.write(out, {"Title": "Hi"}, {"Content": lambda fp: fp.write("<p>streamed</p>")})
+        self.assertEqual("<h1>Hi</h1><p>streamed</p>!", out.getvalue())
+
+    def test_cache_reloads_on_change(self):
+        cache = TemplateCache()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("{{ Content }}")
+            first = cache.load(path)
+            self.assertIs(first, cache.load(path))
+            with open(path, "w") as f:
+                f.write("<main>{{ Content }}</main>")
+            self.assertEqual("<main>x</main>", cache.load(path).render({"Content": "x"}))
+
+    def test_extract_title(self):
+        self.assertEqual("Tolkien Fan Club", extract_title("intro\n\n# Tolkien Fan Club  \n\n## Other"))
+        self.assertIsNone(extract_title("## Not a title"))
+        self.assertEqual("Title", extract_title_from_lines(io.StringIO("text\n# Title\n")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,6 +24,10 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.LINK, "https://www.nrjones.dev")
         self.assertEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("Test node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_repr(self):
         node = TextNode("Test node", TextType.LINK, "https://www.nrjones.dev")
         self.assertEqual("TextNode(Test node, link, https://www.nrjones.dev)", repr(node))
@@ -0,0 +1,149 @@
+import os
+import tempfile
+import time
+import unittest
+
+from src.watch import DependencyGraph, InotifyWatcher, PollingWatcher, WatchSession
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def test_affected_outputs(self):
+        graph = DependencyGraph()
+        graph.add("a.html", ["a.md", "template.html"])
+        graph.add("b.html", ["b.md", "template.html"])
+        self.assertEqual({"a.html"}, graph.affected({"a.md"}))
+        self.assertEqual({"a.html", "b.html"}, graph.affected({"template.html"}))
+        graph.remove("a.html")
+        self.assertEqual({"b.html"}, graph.affected({"template.html"}))
+
+
+class TestWatchSession(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nhello")
+        self.write(os.path.join(self.content, "blog", "post.md"), "post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.session = WatchSession(self.content, self.static, self.public)
+        self.session.start()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, content):
+        with open(path, "w") as f:
+            f.write(content)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_start_renders_pages(self):
+        self.assertEqual("<div><p>post</p></div>", self.read(os.path.join(self.public, "blog", "post.html")))
+
+    def test_rebuild_only_changed_page(self):
+        path = os.path.join(self.content, "index.md")
+        self.write(path, "# Home\n\nchanged")
+        stats = self.session.rebuild({path})
+        self.assertEqual((1, 0), (stats["pages"], stats["assets"]))
+        self.assertEqual("<div><h1>Home</h1><p>changed</p></div>", self.read(os.path.join(self.public, "index.html")))
+        self.assertEqual(1, self.session.memo.hits)
+
+    def test_new_and_deleted_files(self):
+        css = os.path.join(self.static, "site.css")
+        self.write(css, "p {}")
+        post = os.path.join(self.content, "blog", "post.md")
+        os.remove(post)
+        stats = self.session.rebuild({css, post})
+        self.assertEqual((1, 1), (stats["assets"], stats["removed"]))
+        self.assertEqual("p {}", self.read(os.path.join(self.public, "site.css")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+
+    def test_deleted_directory(self):
+        blog = os.path.join(self.content, "blog")
+        os.remove(os.path.join(blog, "post.md"))
+        os.rmdir(blog)
+        stats = self.session.rebuild({blog})
+        self.assertEqual(1, stats["removed"])
+
+    def test_template_change_rebuilds_every_page(self):
+        template = os.path.join(self.tmp.name, "template.html")
+        self.write(template, "<title>{{ Title }}</title>{{ Content }}")
+        session = WatchSession(self.content, self.static, self.public, template_path=template)
+        session.start()
+        self.assertEqual("<title>Home</title><div><h1>Home</h1><p>hello</p></div>", self.read(os.path.join(self.public, "index.html")))
+        self.write(template, "<main>{{ Content }}</main>")
+        stats = session.rebuild({template})
+        self.assertEqual(2, stats["pages"])
+        self.assertEqual("<main><div><p>post</p></div></main>", self.read(os.path.join(self.public, "blog", "post.html")))
+
+    def test_broken_page_is_reported(self):
+        path = os.path.join(self.content, "index.md")
+        self.write(path, "**broken")
+        self.assertEqual(1, self.session.rebuild({path})["errors"])
+
+    def test_broken_page_at_start_is_tracked(self):
+        broken = os.path.join(self.content, "a.md")
+        self.write(broken, "broken **bold")
+        public = os.path.join(self.tmp.name, "fresh")
+        session = WatchSession(self.content, self.static, public)
+        with self.assertLogs("src.watch", level="ERROR"):
+            session.start()
+        self.assertIn(os.path.join(public, "a.html"), session.pages)
+        self.assertEqual("<div><p>post</p></div>", self.read(os.path.join(public, "blog", "post.html")))
+        self.write(broken, "fixed **bold**")
+        self.assertEqual(1, session.rebuild({broken})["pages"])
+        self.assertEqual("<div><p>fixed <b>bold</b></p></div>", self.read(os.path.join(public, "a.html")))
+
+
+class TestWatchers(unittest.TestCase):
+    def test_polling_watcher(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            watcher = PollingWatcher([tmp], interval=0.01)
+            path = os.path.join(tmp, "new.md")
+            with open(path, "w") as f:
+                f.write("x")
+            self.assertEqual({path}, watcher.wait(timeout=1))
+
+    def test_inotify_watches_single_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            template = os.path.join(tmp, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Content }}")
+            try:
+                watcher = InotifyWatcher([template])
+            except (OSError, AttributeError, TypeError):
+                self.skipTest("inotify not available")
+            with open(os.path.join(tmp, "other.txt"), "w") as f:
+                f.write("ignored")
+            with open(template, "w") as f:
+                f.write("<main>{{ Content }}</main>")
+            changed = watcher.wait(timeout=1)
+            watcher.close()
+            self.assertEqual({template}, changed)
+
+    def test_inotify_watcher(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                watcher = InotifyWatcher([tmp])
+            except (OSError, AttributeError, TypeError):
+                self.skipTest("inotify not available")
+            path = os.path.join(tmp, "sub", "new.md")
+            os.mkdir(os.path.dirname(path))
+            time.sleep(0.05)
+            with open(path, "w") as f:
+                f.write("x")
+            changed = set()
+            deadline = time.monotonic() + 2
+            while path not in changed and time.monotonic() < deadline:
+                changed |= watcher.wait(timeout=0.5)
+            watcher.close()
+            self.assertIn(path, changed)
+
+
+if __name__ == "__main__":
+    unittest.main()